@@ -0,0 +1,65 @@
+"""Compare the streaming HTMLNode serializer with recursive concatenation.
+
+Usage: python3 bench/bench_serializer.py [paragraphs]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode
+
+
+def concat_to_html(node):
+    # The previous implementation: each level concatenates its children
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    children_html = ""
+    for child in node.children:
+        children_html += concat_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def build_document(paragraphs):
+    children = []
+    for i in range(paragraphs):
+        children.append(
+            ParentNode(
+                "p",
+                [
+                    LeafNode(None, f"Paragraph {i} with "),
+                    LeafNode("b", "bold"),
+                    LeafNode(None, " text and a "),
+                    LeafNode("a", "link", {"href": f"/blog/post-{i}"}),
+                    LeafNode(None, "."),
+                ],
+            )
+        )
+    return ParentNode("div", children)
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    document = build_document(paragraphs)
+    assert concat_to_html(document) == document.to_html()
+
+    concat = best_of(lambda: concat_to_html(document))
+    streaming = best_of(document.to_html)
+    print(f"paragraphs: {paragraphs}")
+    print(f"concatenation: {concat * 1000:.1f} ms")
+    print(f"streaming:     {streaming * 1000:.1f} ms")
+    print(f"speedup:       {concat / streaming:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Compare two bench/run.py JSON results stage by stage.
+
+Usage: python3 bench/compare.py BASELINE.json CANDIDATE.json
+"""
+import json
+import sys
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        baseline = json.load(f)
+    with open(sys.argv[2]) as f:
+        candidate = json.load(f)
+
+    if baseline["config"] != candidate["config"]:
+        print("warning: runs used different configurations")
+    rows = list(baseline["stages"].items()) + [("total", baseline["total"])]
+    for stage, before in rows:
+        after = candidate["total"] if stage == "total" else candidate["stages"].get(stage)
+        if after is None:
+            continue
+        ratio = before / after if after else float("inf")
+        print(f"{stage:24} {before * 1000:10.1f} ms {after * 1000:10.1f} ms {ratio:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
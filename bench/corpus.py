@@ -0,0 +1,97 @@
+"""Seeded generator for synthetic markdown sites.
+
+Usage: python3 bench/corpus.py OUTPUT_DIR [--pages N] [--seed S]
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "ring hobbit shire wizard elf dwarf mountain river forest road tower "
+    "king ranger sword song council journey shadow light star fellowship"
+).split()
+
+# Relative weight of each block kind in a generated page
+DEFAULT_MIX = {
+    "paragraph": 10,
+    "heading": 3,
+    "unordered_list": 2,
+    "ordered_list": 2,
+    "quote": 1,
+    "code": 1,
+}
+
+
+def sentence(rng, links=0.1, images=0.02):
+    words = []
+    for _ in range(rng.randint(6, 18)):
+        roll = rng.random()
+        word = rng.choice(WORDS)
+        if roll < links:
+            words.append(f"[{word}](/blog/{rng.choice(WORDS)})")
+        elif roll < links + images:
+            words.append(f"![{word}](/images/{word}.png)")
+        elif roll < links + images + 0.05:
+            words.append(f"**{word}**")
+        elif roll < links + images + 0.08:
+            words.append(f"_{word}_")
+        elif roll < links + images + 0.1:
+            words.append(f"`{word}`")
+        else:
+            words.append(word)
+    return " ".join(words).capitalize() + "."
+
+
+def block(rng, kind, links, images):
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + " ".join(rng.choices(WORDS, k=3)).title()
+    if kind == "unordered_list":
+        return "\n".join(f"- {sentence(rng, links, images)}" for _ in range(rng.randint(2, 6)))
+    if kind == "ordered_list":
+        return "\n".join(f"{i}. {sentence(rng, links, images)}" for i in range(1, rng.randint(3, 8)))
+    if kind == "quote":
+        return "\n".join(f"> {sentence(rng, links, images)}" for _ in range(rng.randint(1, 4)))
+    if kind == "code":
+        lines = [f"    {rng.choice(WORDS)} = {rng.randint(0, 99)}" for _ in range(rng.randint(2, 8))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    return "\n".join(sentence(rng, links, images) for _ in range(rng.randint(1, 4)))
+
+
+def generate_markdown(rng, blocks=40, mix=DEFAULT_MIX, links=0.1, images=0.02):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = ["# " + " ".join(rng.choices(WORDS, k=4)).title()]
+    for kind in rng.choices(kinds, weights=weights, k=blocks):
+        parts.append(block(rng, kind, links, images))
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(pages, seed=0, blocks=40, mix=DEFAULT_MIX, links=0.1, images=0.02):
+    """Return a list of (relative path, markdown) pairs."""
+    rng = random.Random(seed)
+    corpus = [("index.md", generate_markdown(rng, blocks, mix, links, images))]
+    for i in range(1, pages):
+        corpus.append((f"blog/post-{i}/index.md", generate_markdown(rng, blocks, mix, links, images)))
+    return corpus
+
+
+def write_corpus(directory, corpus):
+    for rel_path, markdown in corpus:
+        path = os.path.join(directory, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic content/ tree")
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks", type=int, default=40)
+    args = parser.parse_args()
+    write_corpus(args.output, generate_corpus(args.pages, args.seed, args.blocks))
+
+
+if __name__ == "__main__":
+    main()
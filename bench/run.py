@@ -0,0 +1,124 @@
+"""Time each stage of the page pipeline on a synthetic corpus.
+
+Usage: python3 bench/run.py [--pages N] [--seed S] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_corpus, write_corpus
+from markdown_to_blocks import block_to_block_type, extract_title, markdown_to_blocks, markdown_to_html_node
+from split_nodes_delimiter import text_to_textnodes
+from template import CompiledTemplate
+from urls import UrlResolver
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+STAGES = [
+    "read",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "markdown_to_html_node",
+    "to_html",
+    "template",
+    "write",
+]
+
+
+def run(corpus, basepath="/static_site_generator/"):
+    timings = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+    resolver = UrlResolver(basepath)
+    with open(TEMPLATE_PATH) as f:
+        template = CompiledTemplate.compile(f.read()).with_urls(resolver)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, "content")
+        dest_dir = os.path.join(tmp, "docs")
+        write_corpus(source_dir, corpus)
+
+        for rel_path, _ in corpus:
+            start = clock()
+            with open(os.path.join(source_dir, rel_path)) as f:
+                markdown = f.read()
+            timings["read"] += clock() - start
+
+            start = clock()
+            blocks = markdown_to_blocks(markdown)
+            timings["markdown_to_blocks"] += clock() - start
+
+            start = clock()
+            block_types = [block_to_block_type(block) for block in blocks]
+            timings["block_to_block_type"] += clock() - start
+
+            start = clock()
+            for block, block_type in zip(blocks, block_types):
+                if block_type.name == "PARAGRAPH":
+                    text_to_textnodes(block)
+            timings["text_to_textnodes"] += clock() - start
+
+            start = clock()
+            html_node = markdown_to_html_node(markdown, resolver)
+            title = extract_title(markdown)
+            timings["markdown_to_html_node"] += clock() - start
+
+            start = clock()
+            content = html_node.to_html()
+            timings["to_html"] += clock() - start
+
+            start = clock()
+            page = template.render(Title=title, Content=content)
+            timings["template"] += clock() - start
+
+            start = clock()
+            dest_path = os.path.join(dest_dir, rel_path[:-len(".md")] + ".html")
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            with open(dest_path, "w") as f:
+                f.write(page)
+            timings["write"] += clock() - start
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the page pipeline stage by stage")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3, help="keep the best of this many runs per stage")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.pages, args.seed, args.blocks)
+    runs = [run(corpus) for _ in range(args.repeat)]
+    stages = {stage: min(timings[stage] for timings in runs) for stage in STAGES}
+
+    results = {
+        "config": {
+            "pages": args.pages,
+            "seed": args.seed,
+            "blocks": args.blocks,
+            "repeat": args.repeat,
+            "bytes": sum(len(markdown) for _, markdown in corpus),
+        },
+        "python": platform.python_version(),
+        "stages": stages,
+        # markdown_to_html_node already covers the splitting/classifying/inline stages
+        "total": sum(stages[stage] for stage in ["read", "markdown_to_html_node", "to_html", "template", "write"]),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
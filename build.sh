@@ -2,4 +2,4 @@
 set -euo pipefail
 
 # Build the site for GitHub Pages with the repo base path
-python3 src/main.py "/static_site_generator/"
\ No newline at end of file
+python3 src/main.py "/static_site_generator/" --site-url "https://pranavpawarr.github.io"
\ No newline at end of file
@@ -1,3 +1,2 @@
-python3 src/main.py
-cd docs && python3 -m http.server 8888
-Open http://localhost:8888/
\ No newline at end of file
+python3 src/main.py --preview --port 8888
+Open http://localhost:8888/static_site_generator/
\ No newline at end of file
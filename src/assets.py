@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+
+from manifest import CACHE_DIR, hash_file
+from tracing import tracer, DEBUG, INFO
+from walk import walk_files
+
+ASSET_MANIFEST_PATH = os.path.join(CACHE_DIR, "assets.json")
+
+
+def scan_files(root, exclude=None):
+    """Map each file under root (as a /-separated relative path) to its stat."""
+    return {rel_path: entry.stat() for rel_path, entry in walk_files(root, exclude=exclude)}
+
+
+def _copy_file_range(source_path, dest_path):
+    with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_file(source_path, dest_path, link=False):
+    """Copy (or hardlink) a file into place without exposing a partial file.
+
+    The data is written next to the destination and renamed over it, using
+    copy_file_range where the platform has it and shutil (which uses
+    sendfile on Linux) otherwise. The source mtime is preserved so later
+    syncs can compare size and mtime without reading either file.
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    if link:
+        try:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            os.link(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return
+        except OSError:
+            # Different filesystem or no hardlink support; fall back to a copy
+            pass
+    try:
+        _copy_file_range(source_path, tmp_path)
+    except (AttributeError, OSError):
+        shutil.copyfile(source_path, tmp_path)
+    shutil.copystat(source_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def is_unchanged(source_path, source_stat, dest_path, compare="mtime"):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if compare == "hash":
+        return hash_file(source_path) == hash_file(dest_path)
+    return dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def load_synced(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f).get("files", [])
+    except (OSError, ValueError):
+        return []
+
+
+def save_synced(manifest_path, files):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": sorted(files)}, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def sync_static(source="static", destination="docs", manifest_path=ASSET_MANIFEST_PATH, compare="mtime", link=False, names=None, exclude=None):
+    """Bring destination in line with source, touching only changed files.
+
+    Files are compared by size and mtime (or by content hash with
+    compare="hash"). names optionally maps a source path to the path it
+    is published under. Files a previous sync placed in destination that
+    this sync didn't are removed; generated pages living in the same
+    directory are never touched. Files matching an exclude glob are skipped.
+    """
+    source_files = scan_files(source, exclude)
+    names = names or {}
+    synced = set()
+    copied = 0
+    for rel_path, source_stat in source_files.items():
+        source_path = os.path.join(source, rel_path)
+        dest_rel_path = names.get(rel_path, rel_path)
+        synced.add(dest_rel_path)
+        dest_path = os.path.join(destination, dest_rel_path)
+        if is_unchanged(source_path, source_stat, dest_path, compare):
+            continue
+        copy_file(source_path, dest_path, link)
+        copied += 1
+        if tracer.on(DEBUG):
+            tracer.event(DEBUG, "copy", source=source_path, dest=dest_path)
+
+    removed = 0
+    for rel_path in load_synced(manifest_path):
+        if rel_path in synced:
+            continue
+        dest_path = os.path.join(destination, rel_path)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            removed += 1
+            if tracer.on(DEBUG):
+                tracer.event(DEBUG, "remove", dest=dest_path)
+
+    save_synced(manifest_path, synced)
+    tracer.message(INFO, f"Synced {source} -> {destination}: {copied} copied, {len(source_files) - copied} unchanged, {removed} removed")
+    return copied, removed
@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from assets import scan_files
+from manifest import CACHE_DIR, hash_bytes
+from output import write_if_changed
+from tracing import tracer, DEBUG, INFO
+
+GZIP_MANIFEST_PATH = os.path.join(CACHE_DIR, "gzip.json")
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg")
+
+
+def gzip_bytes(data, level=9):
+    # mtime=0 keeps the output stable, so unchanged inputs give identical .gz files
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compress_file(path, level, previous_hash):
+    """Write path.gz unless path still has previous_hash; return (hash, compressed)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hash_bytes(data)
+    gz_path = path + ".gz"
+    if digest == previous_hash and os.path.exists(gz_path):
+        return digest, False
+    write_if_changed(gz_path, gzip_bytes(data, level))
+    return digest, True
+
+
+def load_compressed(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_compressed(manifest_path, data):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def compress_outputs(dest_dir="docs", level=9, max_workers=4, manifest_path=GZIP_MANIFEST_PATH):
+    """Write a .gz sibling next to every HTML, CSS, JS and SVG file in dest_dir.
+
+    Files run on a thread pool (zlib releases the GIL while compressing).
+    A file whose content hash and level match the last run keeps its
+    existing .gz. Siblings of files that have disappeared are removed.
+    Returns (compressed, removed).
+    """
+    previous = load_compressed(manifest_path)
+    if previous.get("level") != level:
+        previous = {}
+    old_hashes = previous.get("files", {})
+
+    targets = sorted(rel_path for rel_path in scan_files(dest_dir) if rel_path.endswith(COMPRESSIBLE_EXTENSIONS))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            rel_path: pool.submit(_compress_file, os.path.join(dest_dir, rel_path), level, old_hashes.get(rel_path))
+            for rel_path in targets
+        }
+    hashes = {}
+    compressed = 0
+    for rel_path, future in futures.items():
+        hashes[rel_path], changed = future.result()
+        if changed:
+            compressed += 1
+            if tracer.on(DEBUG):
+                tracer.event(DEBUG, "gzip", dest=os.path.join(dest_dir, rel_path) + ".gz")
+
+    removed = 0
+    for rel_path in old_hashes:
+        gz_path = os.path.join(dest_dir, rel_path) + ".gz"
+        if rel_path not in hashes and os.path.exists(gz_path):
+            os.remove(gz_path)
+            removed += 1
+
+    save_compressed(manifest_path, {"level": level, "files": hashes})
+    tracer.message(INFO, f"Compressed {dest_dir}: {compressed} written, {len(targets) - compressed} unchanged, {removed} removed")
+    return compressed, removed
+
+
+def remove_compressed(dest_dir="docs", manifest_path=GZIP_MANIFEST_PATH):
+    """Delete the .gz siblings an earlier compress_outputs run wrote, for builds without --gzip.
+
+    Otherwise a build that stops compressing would keep serving, and
+    deploying, .gz files of pages as they were when compression was last on.
+    Returns the number of files removed.
+    """
+    previous = load_compressed(manifest_path)
+    if not previous:
+        return 0
+    removed = 0
+    for rel_path in previous.get("files", {}):
+        gz_path = os.path.join(dest_dir, rel_path) + ".gz"
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            removed += 1
+    os.remove(manifest_path)
+    tracer.message(INFO, f"Removed {removed} compressed file(s) from {dest_dir}")
+    return removed
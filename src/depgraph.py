@@ -0,0 +1,46 @@
+SKIP = "skip"
+FILL = "fill"
+RENDER = "render"
+
+# Inputs that only feed the template fill step; a change to any other
+# input means the page's markdown has to be parsed again
+FILL_INPUTS = frozenset(["template"])
+
+
+class DependencyGraph:
+    """Maps each page to the inputs it was built from.
+
+    Inputs are named values, normally content hashes: "source" for the
+    markdown file, "template", "basepath", and "include:<path>" for any
+    other file a page pulls in.
+    """
+
+    def __init__(self):
+        self.pages = {}
+
+    def add_page(self, page, **inputs):
+        self.pages[page] = inputs
+
+    def add_input(self, page, name, value):
+        self.pages.setdefault(page, {})[name] = value
+
+    def changed_inputs(self, page, previous):
+        """Names of the inputs of page that differ from previous[page]."""
+        old = previous.get(page)
+        new = self.pages[page]
+        if old is None:
+            return set(new)
+        return {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+
+    def plan(self, previous):
+        """Decide per page whether to skip it, only refill the template, or render it."""
+        actions = {}
+        for page in self.pages:
+            changed = self.changed_inputs(page, previous)
+            if not changed:
+                actions[page] = SKIP
+            elif changed <= FILL_INPUTS:
+                actions[page] = FILL
+            else:
+                actions[page] = RENDER
+        return actions
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+from assets import scan_files
+from manifest import CACHE_DIR
+from tracing import tracer, INFO
+
+DEPLOY_MANIFEST_PATH = os.path.join(CACHE_DIR, "deploy.json")
+DELTA_PATH = os.path.join(CACHE_DIR, "delta.json")
+# Name of the delta listing stored inside a bundle, next to the changed files
+BUNDLE_DELTA_NAME = ".ssg-delta.json"
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_deploy_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_deploy_manifest(path, files):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def save_delta(path, changed, deleted):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"changed": changed, "deleted": deleted}, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def build_deploy_manifest(dest_dir, previous=None):
+    """Map every file under dest_dir to its size, SHA-256 and mtime.
+
+    Unchanged outputs are never rewritten, so a file whose size and mtime
+    match the previous manifest keeps its recorded hash without being read.
+    """
+    previous = previous or {}
+    files = {}
+    for rel_path, st in scan_files(dest_dir).items():
+        entry = previous.get(rel_path)
+        if entry is not None and entry["size"] == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            digest = entry["sha256"]
+        else:
+            digest = sha256_file(os.path.join(dest_dir, rel_path))
+        files[rel_path] = {"size": st.st_size, "sha256": digest, "mtime_ns": st.st_mtime_ns}
+    return files
+
+
+def diff_manifests(old, new):
+    """Return (changed, deleted) paths between two manifests, compared by size and hash."""
+    changed = sorted(
+        rel_path
+        for rel_path, entry in new.items()
+        if rel_path not in old
+        or old[rel_path]["size"] != entry["size"]
+        or old[rel_path]["sha256"] != entry["sha256"]
+    )
+    deleted = sorted(rel_path for rel_path in old if rel_path not in new)
+    return changed, deleted
+
+
+def _reset_owner(info):
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def write_bundle(bundle_path, dest_dir, changed, deleted):
+    """Write a tar (gzipped for .tar.gz/.tgz) of the changed files plus the delta listing."""
+    mode = "w:gz" if bundle_path.endswith((".tar.gz", ".tgz")) else "w"
+    delta = json.dumps({"changed": changed, "deleted": deleted}, indent=1).encode()
+    tmp_path = bundle_path + ".tmp"
+    with tarfile.open(tmp_path, mode) as tar:
+        for rel_path in changed:
+            tar.add(os.path.join(dest_dir, rel_path), arcname=rel_path, recursive=False, filter=_reset_owner)
+        info = tarfile.TarInfo(BUNDLE_DELTA_NAME)
+        info.size = len(delta)
+        tar.addfile(info, io.BytesIO(delta))
+    os.replace(tmp_path, bundle_path)
+
+
+def write_deploy_manifest(dest_dir, manifest_path=DEPLOY_MANIFEST_PATH, delta_from=None, bundle_path=None, delta_path=DELTA_PATH):
+    """Record the output tree and, given an older manifest, what changed since.
+
+    The delta is written as JSON to delta_path and, with bundle_path, as a
+    tar holding only the changed files. Returns (changed, deleted), or None
+    without delta_from.
+    """
+    # Read the old manifest first: delta_from may be the file about to be replaced
+    old = load_deploy_manifest(delta_from) if delta_from else None
+    files = build_deploy_manifest(dest_dir, load_deploy_manifest(manifest_path))
+    save_deploy_manifest(manifest_path, files)
+    if old is None:
+        return None
+
+    changed, deleted = diff_manifests(old, files)
+    save_delta(delta_path, changed, deleted)
+    if bundle_path:
+        write_bundle(bundle_path, dest_dir, changed, deleted)
+    size = sum(files[rel_path]["size"] for rel_path in changed)
+    tracer.message(INFO, f"Delta from {delta_from}: {len(changed)} changed ({size} bytes), {len(deleted)} deleted; see {delta_path}")
+    return changed, deleted
@@ -0,0 +1,250 @@
+import mimetypes
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from manifest import hash_file
+from tracing import tracer, ERROR, INFO
+from urls import normalize_basepath
+from walk import is_excluded
+
+
+class ByteLRU:
+    """A least-recently-used cache bounded by the total size of its values."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def is_site_path(path):
+    """Whether path is a plain relative site path: no leading slash, no empty, . or .. segments.
+
+    Only the last segment may be empty, for directory URLs such as blog/tom/.
+    """
+    if "\\" in path or "\0" in path:
+        return False
+    segments = path.split("/")
+    for segment in segments[:-1]:
+        if segment in ("", ".", ".."):
+            return False
+    return segments[-1] not in (".", "..")
+
+
+def contained_path(root, rel_path):
+    """Join rel_path onto root, or return None if the real result leaves root."""
+    real_root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(real_root, rel_path))
+    if path != real_root and not path.startswith(real_root + os.sep):
+        return None
+    return path
+
+
+class PreviewSite:
+    """Renders pages from content_dir when they are requested.
+
+    Rendered pages are cached by source hash and template mtime, and the
+    same pair makes the ETag, so a revalidation is answered from two
+    stat calls without rendering or reading the page. Files matching an
+    exclude glob are not served, as the build does not publish them.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, render_page, cache_bytes=64 * 1024 * 1024, exclude=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.render_page = render_page
+        self.exclude = exclude or ()
+        self.pages = ByteLRU(cache_bytes)
+        self.hashes = {}
+
+    def source_hash(self, source_path, st):
+        stamp = (st.st_size, st.st_mtime_ns)
+        cached = self.hashes.get(source_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        digest = hash_file(source_path)
+        self.hashes[source_path] = (stamp, digest)
+        return digest
+
+    def find_source(self, path):
+        """Map a site path such as blog/tom/ to its markdown file and canonical path."""
+        if path == "" or path.endswith("/"):
+            candidates = [(path + "index.md", path)]
+        elif path.endswith("index.html"):
+            candidates = [(path[:-len("html")] + "md", path)]
+        elif path.endswith(".html"):
+            candidates = [(path[:-len(".html")] + ".md", path)]
+        else:
+            candidates = [(path + "/index.md", path + "/")]
+        for rel_path, canonical in candidates:
+            if is_excluded(rel_path, self.exclude):
+                continue
+            source_path = contained_path(self.content_dir, rel_path)
+            if source_path is not None and os.path.isfile(source_path):
+                return source_path, canonical
+        return None, None
+
+    def find_static(self, path):
+        if is_excluded(path, self.exclude):
+            return None
+        static_path = contained_path(self.static_dir, path)
+        if path and static_path is not None and os.path.isfile(static_path):
+            return static_path
+        return None
+
+    def etag(self, source_path):
+        st = os.stat(source_path)
+        template_mtime = os.stat(self.template_path).st_mtime_ns
+        return f'"{self.source_hash(source_path, st)[:16]}-{template_mtime:x}"'
+
+    def page(self, source_path, etag):
+        body = self.pages.get(etag)
+        if body is None:
+            body = self.render_page(source_path).encode()
+            self.pages.put(etag, body)
+        return body
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    site = None
+    basepath = "/"
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def handle_request(self, send_body):
+        url_path = unquote(urlsplit(self.path).path)
+        if not url_path.startswith(self.basepath):
+            if url_path + "/" == self.basepath:
+                return self.redirect(self.basepath)
+            return self.send_error(HTTPStatus.NOT_FOUND)
+        path = url_path[len(self.basepath):]
+        # Paths are decoded first, so %2F and %2E%2E are caught here too
+        if not is_site_path(path):
+            return self.send_error(HTTPStatus.NOT_FOUND)
+
+        source_path, canonical = self.site.find_source(path)
+        if source_path is not None:
+            if canonical != path:
+                return self.redirect(self.basepath + canonical)
+            return self.send_page(source_path, send_body)
+
+        static_path = self.site.find_static(path)
+        if static_path is not None:
+            return self.send_static(static_path, send_body)
+        self.send_error(HTTPStatus.NOT_FOUND)
+
+    def redirect(self, location):
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def not_modified(self, etag):
+        if self.headers.get("If-None-Match") != etag:
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        return True
+
+    def send_page(self, source_path, send_body):
+        etag = self.site.etag(source_path)
+        if self.not_modified(etag):
+            return
+        try:
+            body = self.site.page(source_path, etag)
+        except Exception as e:
+            tracer.message(ERROR, f"Error: {source_path}: {type(e).__name__}: {e}")
+            return self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_static(self, static_path, send_body):
+        with open(static_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+            if self.not_modified(etag):
+                return
+            content_type = mimetypes.guess_type(static_path)[0] or "application/octet-stream"
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(st.st_size))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.send_file(f, st.st_size)
+
+    def send_file(self, f, size):
+        """Send a file with sendfile, so its bytes never pass through Python."""
+        self.wfile.flush()
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            if offset:
+                raise
+            shutil.copyfileobj(f, self.wfile)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def preview(site, basepath="/", port=8888, background=False, host="127.0.0.1"):
+    """Serve site under basepath, blocking unless background is set.
+
+    Only the local machine can connect unless another host is given.
+    """
+    basepath = normalize_basepath(basepath)
+    handler = type("Handler", (PreviewRequestHandler,), {"site": site, "basepath": basepath})
+    server = ThreadingHTTPServer((host, port), handler)
+    tracer.message(INFO, f"Previewing {site.content_dir} at http://localhost:{server.server_address[1]}{basepath}")
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
@@ -0,0 +1,166 @@
+import json
+import os
+import struct
+
+from assets import scan_files
+from manifest import CACHE_DIR, hash_bytes, hash_file
+
+ASSET_MAP_PATH = os.path.join(CACHE_DIR, "asset_map.json")
+
+# Files referenced by URL from pages and templates. Anything else (e.g.
+# favicon.ico, robots.txt) keeps its name because it is fetched by name.
+FINGERPRINT_EXTENSIONS = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".woff", ".woff2")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# JPEG start-of-frame markers, which carry the image size
+JPEG_SOF_MARKERS = frozenset([0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF])
+JPEG_STANDALONE_MARKERS = frozenset([0x01, 0xD8] + list(range(0xD0, 0xD8)))
+
+
+def _jpeg_size(f):
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _webp_size(head):
+    chunk = head[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        b0, b1, b2, b3 = head[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b"VP8X":
+        return 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+    return None
+
+
+def image_size(path):
+    """Return (width, height) from a PNG, GIF, WebP or JPEG header, or None.
+
+    Only the header is read; the image is never decoded.
+    """
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    return None
+
+
+def fingerprinted_name(rel_path, digest):
+    """index.css -> index.3f9a1c2b.css"""
+    directory, name = os.path.split(rel_path)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(directory, f"{stem}.{digest[:8]}{ext}").replace(os.sep, "/")
+
+
+class AssetMap:
+    """Lookup table from static file paths to their published form.
+
+    names maps a /-separated path relative to the static root to its
+    fingerprinted path; sizes maps image paths to (width, height).
+    """
+
+    def __init__(self, names=None, sizes=None):
+        self.names = names if names is not None else {}
+        self.sizes = sizes if sizes is not None else {}
+        self.digest = hash_bytes(json.dumps(sorted(self.names.items())).encode())
+
+    def published_path(self, path):
+        """Map a site path without its leading slash, keeping any query or fragment."""
+        end = len(path)
+        for char in "?#":
+            index = path.find(char)
+            if index != -1:
+                end = min(end, index)
+        return self.names.get(path[:end], path[:end]) + path[end:]
+
+    def image_size(self, path):
+        return self.sizes.get(path)
+
+    def __repr__(self):
+        return f"AssetMap({len(self.names)} files)"
+
+
+def load_asset_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    return data.get("files", {}), data.get("sizes", {})
+
+
+def save_asset_cache(cache_path, files, sizes):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": files, "sizes": sizes}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def build_asset_map(static_dir="static", cache_path=ASSET_MAP_PATH, exclude=None):
+    """Hash the static files and read image sizes, reusing the last build's work.
+
+    A file whose size and mtime are unchanged keeps its cached hash, and
+    image sizes are cached by content hash, so an unchanged tree costs
+    one scan and no reads.
+    """
+    old_files, old_sizes = load_asset_cache(cache_path)
+    files = {}
+    sizes = {}
+    names = {}
+    image_sizes = {}
+    for rel_path, st in scan_files(static_dir, exclude).items():
+        if not rel_path.lower().endswith(FINGERPRINT_EXTENSIONS):
+            continue
+        entry = old_files.get(rel_path)
+        if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            digest = entry["hash"]
+        else:
+            digest = hash_file(os.path.join(static_dir, rel_path))
+        files[rel_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+        names[rel_path] = fingerprinted_name(rel_path, digest)
+
+        if rel_path.lower().endswith(IMAGE_EXTENSIONS):
+            size = old_sizes.get(digest)
+            if size is None:
+                size = image_size(os.path.join(static_dir, rel_path))
+            if size is not None:
+                sizes[digest] = list(size)
+                image_sizes[rel_path] = tuple(size)
+
+    save_asset_cache(cache_path, files, sizes)
+    return AssetMap(names, image_sizes)
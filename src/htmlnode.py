@@ -1,53 +1,118 @@
+import sys
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag is not None else None
         self.value = value
         self.children = children
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+
+    def write_html(self, write):
+        """Serialize the tree by passing each piece of markup to write()."""
+        # An explicit stack, not recursion, so deep trees can't hit the
+        # recursion limit; closing tags go on it as plain strings
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is str:
+                write(item)
+            else:
+                item._write_open(write, stack)
+
+    def render_to(self, file):
+        self.write_html(file.write)
+
+    def _write_open(self, write, stack):
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
-        if self.props is None:
+        if not self.props:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        props = self.props.items() if isinstance(self.props, dict) else self.props
+        return "".join([f' {prop}="{value}"' for prop, value in props])
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def _write_open(self, write, stack):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            write(self.value)
+        else:
+            write(f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>")
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def _write_open(self, write, stack):
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        write(f"<{self.tag}{self.props_to_html()}>")
+        stack.append(f"</{self.tag}>")
+        stack.extend(reversed(self.children))
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+
+
+class StreamingParentNode(ParentNode):
+    """A ParentNode whose children come from an iterator, so it can only be written once."""
+
+    __slots__ = ()
+
+    def _write_open(self, write, stack):
+        if self.tag is None:
+            raise ValueError("invalid HTML: no tag")
+        if self.children is None:
+            raise ValueError("invalid HTML: no children")
+        write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child.write_html(write)
+        write(f"</{self.tag}>")
+
+    def __repr__(self):
+        return f"StreamingParentNode({self.tag}, {self.props})"
+
+
+class TeeNode:
+    """Serializes node while copying every piece of its markup to copy()."""
+
+    __slots__ = ("node", "copy")
+
+    def __init__(self, node, copy):
+        self.node = node
+        self.copy = copy
+
+    def write_html(self, write):
+        copy = self.copy
+
+        def both(piece):
+            copy(piece)
+            write(piece)
+
+        self.node.write_html(both)
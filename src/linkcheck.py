@@ -0,0 +1,97 @@
+import sys
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import scan_files
+from tracing import tracer, INFO
+from urls import UrlResolver, is_external
+
+
+def site_targets(dest_dir):
+    """Every path a link into the built site may point at.
+
+    Paths are relative to dest_dir with / separators; a directory with an
+    index.html is reachable both with and without its trailing slash.
+    """
+    targets = set()
+    for rel_path in scan_files(dest_dir):
+        targets.add(rel_path)
+        if rel_path == "index.html" or rel_path.endswith("/index.html"):
+            directory = rel_path[:-len("index.html")]
+            targets.add(directory)
+            targets.add(directory.rstrip("/"))
+    return targets
+
+
+def reference_path(url, resolver, page_url="/"):
+    """The output path url on the page at page_url refers to, or None for links that aren't checked.
+
+    A link that leaves the basepath is returned as its full URL path, which
+    is never a target.
+    """
+    if not url or url.startswith("#") or is_external(url):
+        return None
+    resolved = urllib.parse.urljoin(page_url, resolver.resolve(url))
+    for char in "?#":
+        resolved = resolved.split(char, 1)[0]
+    resolved = urllib.parse.unquote(resolved)
+    if not resolved.startswith(resolver.basepath):
+        return resolved
+    return resolved[len(resolver.basepath):]
+
+
+# Set once per worker process so the target set is sent to each worker once
+_targets = None
+_resolver = None
+
+
+def _init_worker(targets, resolver):
+    global _targets, _resolver
+    _targets = targets
+    _resolver = resolver
+
+
+def _check_pages(pages):
+    broken = []
+    for source_path, page_url, references in pages:
+        for kind, url, line in references:
+            path = reference_path(url, _resolver, page_url)
+            if path is not None and path not in _targets:
+                broken.append((source_path, line, kind, url))
+    return broken
+
+
+def check_links(index, dest_dir, basepath="/", assets=None, jobs=1):
+    """Check every link and image recorded in the site index against dest_dir.
+
+    Nothing is fetched: references are resolved the same way pages were
+    rendered and looked up in the set of files that were built. Returns
+    sorted (source, line, kind, url) tuples for the broken ones.
+    """
+    targets = site_targets(dest_dir)
+    resolver = UrlResolver(basepath, assets)
+    pages = []
+    count = 0
+    for source_path, meta in sorted(index.pages.items()):
+        references = [("link", url, line) for url, line in meta.links]
+        references += [("image", url, line) for url, line in meta.images]
+        pages.append((source_path, meta.url, references))
+        count += len(references)
+
+    if jobs > 1 and len(pages) > 1:
+        size = max(1, len(pages) // (jobs * 4))
+        chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(targets, resolver)) as pool:
+            results = list(pool.map(_check_pages, chunks))
+    else:
+        _init_worker(targets, resolver)
+        results = [_check_pages(pages)]
+
+    broken = sorted(problem for result in results for problem in result)
+    tracer.message(INFO, f"Checked {count} links on {len(pages)} pages: {len(broken)} broken")
+    return broken
+
+
+def report_broken_links(broken):
+    for source_path, line, kind, url in broken:
+        print(f"{source_path}:{line}: broken {kind}: {url}", file=sys.stderr)
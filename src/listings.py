@@ -0,0 +1,162 @@
+import html
+import json
+import os
+
+from htmlnode import LeafNode, ParentNode
+from manifest import CACHE_DIR, hash_bytes, hash_file
+from markdown_to_blocks import slugify
+from output import remove_output, write_if_changed
+from template import load_template
+from tracing import tracer, DEBUG, INFO
+from urls import UrlResolver
+
+LISTINGS_PATH = os.path.join(CACHE_DIR, "listings.json")
+PAGE_SIZE = 10
+
+
+def paginate(posts, page_size=PAGE_SIZE):
+    """Split newest-first posts into pages, numbered from the oldest.
+
+    Page 1 holds the oldest posts, so a new post only changes the newest
+    page (or starts a new one) instead of shifting every page by one.
+    Each page lists its own posts newest first.
+    """
+    oldest_first = posts[::-1]
+    chunks = [oldest_first[i:i + page_size] for i in range(0, len(oldest_first), page_size)]
+    return [chunk[::-1] for chunk in chunks]
+
+
+def entry_path(base):
+    """The stable entry page of a listing, which mirrors its newest page."""
+    return f"{base}page/index.html"
+
+
+def blog_entry_url(basepath="/", blog_dir="blog"):
+    return f"{basepath}{blog_dir}/page/"
+
+
+def listing_pages(index, basepath="/", blog_dir="blog", page_size=PAGE_SIZE):
+    """Map each listing's output path to (base dir, title, number, page count, posts).
+
+    There is one paginated listing for the whole blog under blog/page/N/
+    and one per tag under blog/tags/<tag>/page/N/. The newest page is also
+    written to blog/page/ (and blog/tags/<tag>/page/), so there is one URL
+    to link to that always shows the latest posts.
+    """
+    blog_url = f"{basepath}{blog_dir}/"
+    posts = [meta for meta in index.sorted_pages(blog_url) if meta.url != blog_url]
+    groups = [(f"{blog_dir}/", "Blog", posts)]
+    tags = {}
+    for meta in posts:
+        for tag in meta.tags:
+            name, tagged = tags.setdefault(slugify(tag), (tag, []))
+            tagged.append(meta)
+    for slug, (name, tagged) in sorted(tags.items()):
+        groups.append((f"{blog_dir}/tags/{slug}/", f"Posts tagged {name}", tagged))
+
+    listings = {}
+    for base, title, group in groups:
+        pages = paginate(group, page_size)
+        for number, page in enumerate(pages, start=1):
+            listings[f"{base}page/{number}/index.html"] = (base, title, number, len(pages), page)
+        if pages:
+            listings[entry_path(base)] = (base, title, len(pages), len(pages), pages[-1])
+    return listings
+
+
+def listing_node(base_url, title, number, count, posts):
+    items = []
+    for meta in posts:
+        items.append(ParentNode("li", [
+            LeafNode("a", html.escape(meta.title, quote=False), (("href", meta.url),)),
+            LeafNode(None, " "),
+            LeafNode("time", meta.date[:10], (("datetime", meta.date),)),
+        ]))
+    children = [LeafNode("h1", html.escape(title, quote=False)), ParentNode("ul", items)]
+    nav = []
+    if number < count:
+        nav.append(LeafNode("a", "Newer posts", (("href", f"{base_url}page/{number + 1}/"),)))
+    if number > 1:
+        nav.append(LeafNode("a", "Older posts", (("href", f"{base_url}page/{number - 1}/"),)))
+    if number < count:
+        nav.append(LeafNode("a", "Latest posts", (("href", f"{base_url}page/"),)))
+    if nav:
+        children.append(ParentNode("nav", nav))
+    return ParentNode("div", children)
+
+
+def load_listing_digests(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f).get("pages", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_listing_digests(cache_path, digests):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pages": digests}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def generate_listings(index, template_path, dest_dir, basepath="/", page_size=PAGE_SIZE, minify=False, assets=None, cache_path=LISTINGS_PATH):
+    """Write the blog and tag listing pages from the site index.
+
+    Each listing page is summarized by a digest of its posts, its
+    neighbours and the template. Only pages whose digest changed since the
+    last build are rendered; listings that no longer exist are removed.
+    Returns (rendered, removed).
+    """
+    resolver = UrlResolver(basepath, assets)
+    template = load_template(template_path, resolver, minify)
+    render_key = [hash_file(template_path), list(resolver.cache_key), minify]
+    previous = load_listing_digests(cache_path)
+    listings = listing_pages(index, resolver.basepath, page_size=page_size)
+
+    digests = {}
+    rendered = 0
+    for rel_path, (base, title, number, count, posts) in listings.items():
+        # The page count only matters for whether a newer page exists, so
+        # older pages stay unchanged when a new page is started
+        entry = rel_path == entry_path(base)
+        summary = [title, number, number < count, entry, [[meta.url, meta.title, meta.date] for meta in posts], render_key]
+        digest = hash_bytes(json.dumps(summary).encode())
+        digests[rel_path] = digest
+        dest_path = os.path.join(dest_dir, rel_path)
+        if previous.get(rel_path) == digest and os.path.exists(dest_path):
+            continue
+        node = listing_node(resolver.basepath + base, title, number, count, posts)
+        page_title = title if number == 1 or entry else f"{title}, page {number}"
+        write_if_changed(dest_path, template.render(Title=page_title, Content=node).encode())
+        rendered += 1
+        if tracer.on(DEBUG):
+            tracer.event(DEBUG, "listing", dest=dest_path, posts=len(posts))
+
+    removed = 0
+    for rel_path in previous:
+        if rel_path not in listings:
+            remove_output(os.path.join(dest_dir, rel_path), dest_dir)
+            removed += 1
+
+    save_listing_digests(cache_path, digests)
+    tracer.message(INFO, f"Listings: {rendered} rendered, {len(listings) - rendered} unchanged, {removed} removed")
+    return rendered, removed
+
+
+def remove_listings(dest_dir, cache_path=LISTINGS_PATH):
+    """Delete the listing pages an earlier build wrote, for builds without --listings.
+
+    Returns the number of pages removed.
+    """
+    if not os.path.exists(cache_path):
+        return 0
+    removed = 0
+    for rel_path in load_listing_digests(cache_path):
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.exists(dest_path):
+            remove_output(dest_path, dest_dir)
+            removed += 1
+    os.remove(cache_path)
+    return removed
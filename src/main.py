@@ -1,110 +1,495 @@
+import argparse
+import contextlib
+import functools
 import os
-import sys
 import shutil
-from markdown_to_blocks import markdown_to_html_node, extract_title
-
-def copy_static_to_public(source="static", destination="docs"):
-    if os.path.exists(destination):
-        print(f"Deleting existing directory: {destination}")
-        shutil.rmtree(destination)
-    
-    print(f"Creating directory: {destination}")
-    os.mkdir(destination)
-
-    copy_directory_recursive(source, destination)
-    print(f"\nCopy complete: {source} -> {destination}")
-
-def copy_directory_recursive(source, destination):
-    items = os.listdir(source)
-    for item in items:
-        source_path = os.path.join(source,item)
-        dest_path = os.path.join(destination,item)
-
-        if os.path.isfile(source_path):
-            shutil.copy(source_path, dest_path)
-            print(f"Copying file: {source_path} -> {dest_path}")
-        else:
-            print(f"Creating directory: {dest_path}")
-            os.mkdir(dest_path)
-            copy_directory_recursive(source_path, dest_path)
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import tracing
+from tracing import tracer, DEBUG, INFO
+from assets import sync_static
+from compress import compress_outputs, remove_compressed
+from deploy import write_deploy_manifest
+from devserver import PreviewSite, preview
+from fingerprint import build_asset_map
+from linkcheck import check_links, report_broken_links
+from listings import blog_entry_url, generate_listings, remove_listings
+from depgraph import DependencyGraph, FILL, RENDER, SKIP
+from htmlnode import StreamingParentNode, TeeNode
+from markdown_to_blocks import stream_document
+from output import ImmediateWriter, OutputWriter, discard_trees, hold_cache, open_replacing, prepare_staging, release_cache, remove_output, swap_in
+from manifest import BuildManifest, CACHE_DIR, MANIFEST_PATH, body_cache_path, hash_file, load_body, prune_bodies, save_body
+from site_index import INDEX_PATH, PageMeta, SiteIndex, file_date, normalize_date, page_url, remove_site_files, write_site_files
+from template import load_template
+from urls import UrlResolver
+from walk import walk_files
+from watch import SiteWatcher, serve
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"[generate_page] basepath={basepath}")
+def generate_page(from_path, template_path, dest_path, basepath="/", writer=None, minify=False, assets=None, body_path=None, copy_body=None):
+    """Render one markdown file into dest_path and return its Document; body_path and copy_body also get the body."""
+    tracing_on = tracer.on(DEBUG)
+    if tracing_on:
+        start = time.perf_counter()
+        tracer.event(DEBUG, "page_start", source=from_path, dest=dest_path, basepath=basepath)
+
+    resolver = UrlResolver(basepath, assets)
+    template = load_template(template_path, resolver, minify)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    # The markdown is read line by line and each block is rendered as it
+    # is parsed, so page size doesn't bound memory use. The title comes
+    # out of the same pass rather than a separate scan of the file.
     with open(from_path) as f:
-        markdown = f.read()
-    with open(template_path) as f:
-        template = f.read()
-
-    html_node = markdown_to_html_node(markdown)
-    title = extract_title(markdown)
-    html_content = html_node.to_html()
-
-    final_html = template.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
-    
-    print("[before normalization]", final_html[:300])
-    
-    final_html = final_html.replace('href="blog/', 'href="/blog/')
-    final_html = final_html.replace('href="contact"', 'href="/contact"')  # No trailing slash
-    final_html = final_html.replace('href="contact/', 'href="/contact/')  # With trailing slash
-    final_html = final_html.replace('href="index.css"', 'href="/index.css"')
-    final_html = final_html.replace('src="images/', 'src="/images/')
-    
-    print("[after normalization]", final_html[:300])
-    
-
-    if not basepath.endswith("/"):
-        basepath = basepath + "/"
-    if not basepath.startswith("/"):
-        basepath = "/" + basepath
-    
-    # Diagnostic counts BEFORE basepath replacement
-    print("count href-root", final_html.count('href="/'))
-    print("count src-root", final_html.count('src="/'))
-    
-    # Apply basepath replacements (double quotes)
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
-    
-    # Apply basepath replacements (single quotes)
-    final_html = final_html.replace("href='/", f"href='{basepath}")
-    final_html = final_html.replace("src='/", f"src='{basepath}")
-    
-    # Apply basepath replacements (with spaces - less common but possible)
-    final_html = final_html.replace('href= "/', f'href="{basepath}')
-    final_html = final_html.replace("href= '/", f"href='{basepath}")
-    
-    # Diagnostic counts AFTER basepath replacement
-    print("count href-base", final_html.count(f'href="{basepath}'))
-    print("count src-base", final_html.count(f'src="{basepath}'))
-    print("[after basepath]", final_html[:300])
+        doc, nodes = stream_document(f, resolver)
+        title = doc.title
+        html_node = StreamingParentNode("div", nodes)
+        if tracing_on:
+            tracer.event(DEBUG, "parse", source=from_path, title=title)
+
+        with save_body(body_path, title) if body_path else contextlib.nullcontext() as cache_write:
+            for copy in (cache_write, copy_body):
+                if copy is not None:
+                    html_node = TeeNode(html_node, copy)
+            if not tracing_on:
+                with open_page(writer, dest_path) as out:
+                    template.write(out.write, Title=title, Content=html_node)
+                return doc
+
+            # Diagnostics need the whole page as one string
+            final_html = template.render(Title=title, Content=html_node)
+
+    if tracing_on:
+        tracer.event(
+            DEBUG,
+            "render",
+            source=from_path,
+            bytes=len(final_html),
+            href_count=final_html.count('href="'),
+            src_count=final_html.count('src="'),
+        )
+    if writer is not None:
+        writer.write(dest_path, final_html)
+    else:
+        with open_replacing(dest_path) as out:
+            out.write(final_html)
+    if tracing_on:
+        tracer.event(DEBUG, "write", dest=dest_path)
+        tracer.event(DEBUG, "page_end", source=from_path, ms=round((time.perf_counter() - start) * 1000, 3))
+    return doc
+
+
+
+def render_page_html(from_path, template_path, basepath="/", minify=False):
+    """Render one markdown file to its full page HTML without writing it anywhere."""
+    resolver = UrlResolver(basepath)
+    template = load_template(template_path, resolver, minify)
+    with open(from_path) as f:
+        doc, nodes = stream_document(f, resolver)
+        return template.render(Title=doc.title, Content=StreamingParentNode("div", nodes))
+
+
+def open_page(writer, dest_path):
+    # Pages are streamed to disk rather than handed to writer.write() whole
+    return writer.open(dest_path) if writer is not None else open_replacing(dest_path)
+
 
+def fill_page(template_path, dest_path, title, body, basepath="/", writer=None, minify=False, assets=None):
+    """Wrap an already rendered body in the template and write the page."""
+    template = load_template(template_path, UrlResolver(basepath, assets), minify)
     os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(final_html)
-
-
-
-# py
-def generate_pages_recursively(dir_path_content, template_path, dest_dir_path, basepath="/"):
-    os.makedirs(dest_dir_path, exist_ok=True)
-    for item in os.listdir(dir_path_content):
-        item_path = os.path.join(dir_path_content, item)
-        if os.path.isfile(item_path) and item.endswith(".md"):
-            dest_path = os.path.join(dest_dir_path, item.replace(".md", ".html"))
-            generate_page(item_path, template_path, dest_path, basepath)
-        elif os.path.isdir(item_path):
-            new_dest_dir = os.path.join(dest_dir_path, item)
-            generate_pages_recursively(item_path, template_path, new_dest_dir, basepath)
-def main():
-
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    with open_page(writer, dest_path) as f:
+        template.write(f.write, Title=title, Content=body)
+
+
+def iter_pages(dir_path_content, dest_dir_path, exclude=None):
+    """Lazily yield (source, dest) for each markdown file, in sorted order."""
+    for rel_path, entry in walk_files(dir_path_content, include=["*.md"], exclude=exclude):
+        yield entry.path, os.path.join(dest_dir_path, rel_path[:-len(".md")] + ".html")
+
+
+def collect_pages(dir_path_content, dest_dir_path, exclude=None):
+    return list(iter_pages(dir_path_content, dest_dir_path, exclude))
+
+
+def page_info(doc):
+    """The part of a Document the site index keeps, as PageMeta fields."""
+    date = doc.front_matter.get("date")
+    return {
+        "title": doc.title,
+        "date": normalize_date(date) if date else None,
+        "word_count": doc.word_count,
+        "links": [[url, line] for url, line in doc.links],
+        "images": [[url, line] for url, _, line in doc.images],
+        "tags": doc.tags,
+    }
+
+
+def _render_page_job(job):
+    source_path, template_path, dest_path, basepath, writer, minify, assets = job
+    try:
+        doc = generate_page(source_path, template_path, dest_path, basepath, writer, minify, assets)
+        info = page_info(doc)
+    except Exception as e:
+        return source_path, f"{type(e).__name__}: {e}", None
+    return source_path, None, info
+
+
+def _incremental_page_job(job):
+    source_path, template_path, dest_path, basepath, action, body_path, writer, minify, assets = job
+    try:
+        info = None
+        cached = load_body(body_path) if action == FILL else None
+        if cached is None:
+            doc = generate_page(source_path, template_path, dest_path, basepath, writer, minify, assets, body_path)
+            info = page_info(doc)
+        else:
+            fill_page(template_path, dest_path, cached.title, cached, basepath, writer, minify, assets)
+        if tracer.on(DEBUG):
+            tracer.event(DEBUG, "write", source=source_path, dest=dest_path, action=action if cached else RENDER)
+    except Exception as e:
+        return source_path, f"{type(e).__name__}: {e}", None
+    return source_path, None, info
+
+
+def run_jobs(func, work, jobs=1):
+    """Run func over work items, on a process pool when jobs > 1, and return ({source: error}, {source: info})."""
+    if jobs > 1 and len(work) > 1:
+        chunksize = max(1, len(work) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=tracing.configure, initargs=tracing.current_config()) as pool:
+            results = list(pool.map(func, work, chunksize=chunksize))
+    else:
+        results = [func(job) for job in work]
+    failures = {source_path: error for source_path, error, _ in results if error is not None}
+    infos = {source_path: info for source_path, _, info in results if info is not None}
+    return failures, infos
+
+
+def job_writer(writer, jobs):
+    # Worker processes can't share the writer's thread pool, so each one
+    # writes its own pages in place (still skipping unchanged files)
+    if writer is not None and jobs > 1:
+        return ImmediateWriter()
+    return writer
+
+
+def render_pages(pages, template_path, basepath="/", jobs=1, writer=None, minify=False, assets=None):
+    """Render (source, dest) pairs, returning ({source: error}, {source: info})."""
+    writer = job_writer(writer, jobs)
+    work = [(source_path, template_path, dest_path, basepath, writer, minify, assets) for source_path, dest_path in pages]
+    return run_jobs(_render_page_job, work, jobs)
+
+
+def report_failures(failures):
+    for source_path, error in sorted(failures.items()):
+        print(f"Error: {source_path}: {error}", file=sys.stderr)
+    if failures:
+        print(f"{len(failures)} page(s) failed to build", file=sys.stderr)
+
+
+def update_index(index, pages, infos, dest_dir_path, basepath="/"):
+    """Record metadata for the pages that were rendered in this build."""
+    dest_paths = dict(pages)
+    for source_path, info in infos.items():
+        url = page_url(dest_paths[source_path], dest_dir_path, basepath)
+        date = info.pop("date") or file_date(source_path)
+        index.update(PageMeta(source_path, url, date=date, **info))
+    index.retain(dest_paths)
+
+
+def template_identity(template_path, minify=False):
+    """The template input every page depends on."""
+    template_hash = hash_file(template_path)
+    if minify:
+        # Minifying changes what the fill step produces, so toggling it
+        # counts as a template change and refills every page
+        template_hash += ":minify"
+    return template_hash
+
+
+def record_pages(pages, failures, template_path, dest_dir_path, basepath="/", manifest_path=MANIFEST_PATH, minify=False, assets=None):
+    """Record a full build in the manifest and remove outputs of deleted pages."""
+    # Full builds update docs/ in place, so nothing else clears out pages whose source is gone
+    manifest = BuildManifest.load(manifest_path)
+    template_hash = template_identity(template_path, minify)
+    assets_digest = assets.digest if assets is not None else None
+    for source_path, dest_path in pages:
+        if source_path not in failures:
+            output = os.path.relpath(dest_path, dest_dir_path)
+            manifest.record(source_path, manifest.source_hash(source_path), template_hash, basepath, output, assets_digest)
+    for output in manifest.remove_missing({source_path for source_path, _ in pages}):
+        remove_output(os.path.join(dest_dir_path, output), dest_dir_path)
+    manifest.save()
+
+
+def generate_pages_incrementally(dir_path_content, template_path, dest_dir_path, basepath="/", manifest_path=MANIFEST_PATH, jobs=1, writer=None, index=None, minify=False, assets=None, exclude=None):
+    """Re-render changed pages and refill pages whose only change is the template."""
+    manifest = BuildManifest.load(manifest_path)
+    template_hash = template_identity(template_path, minify)
+    pages = collect_pages(dir_path_content, dest_dir_path, exclude)
+
+    assets_digest = assets.digest if assets is not None else None
+    graph = DependencyGraph()
+    for source_path, _ in pages:
+        graph.add_page(source_path, source=manifest.source_hash(source_path), template=template_hash, basepath=basepath, assets=assets_digest)
+    actions = graph.plan(manifest.inputs())
+
+    body_dir = os.path.join(os.path.dirname(manifest_path), "bodies")
+    writer = job_writer(writer, jobs)
+    work = []
+    body_paths = {}
+    for source_path, dest_path in pages:
+        body_path = body_cache_path(graph.pages[source_path]["source"], basepath, body_dir, assets_digest)
+        body_paths[source_path] = body_path
+        action = actions[source_path]
+        if action == SKIP:
+            if os.path.exists(dest_path):
+                continue
+            action = FILL
+        work.append((source_path, template_path, dest_path, basepath, action, body_path, writer, minify, assets))
+
+    failures, infos = run_jobs(_incremental_page_job, work, jobs)
+    if index is not None:
+        update_index(index, pages, infos, dest_dir_path, UrlResolver(basepath).basepath)
+    for source_path, _, dest_path, *_ in work:
+        if source_path not in failures:
+            # Outputs are recorded relative to the output root so a build
+            # into a staging directory still matches the previous one
+            output = os.path.relpath(dest_path, dest_dir_path)
+            manifest.record(source_path, graph.pages[source_path]["source"], template_hash, basepath, output, assets_digest)
+    # A FILL job whose body isn't cached renders the page, and only
+    # rendered pages report info
+    rendered = len(infos)
+    filled = len(work) - len(failures) - rendered
+
+    removed = manifest.remove_missing({source_path for source_path, _ in pages})
+    for output in removed:
+        remove_output(os.path.join(dest_dir_path, output), dest_dir_path)
+
+    manifest.save()
+    prune_bodies(set(body_paths.values()), body_dir)
+    tracer.message(INFO, f"Incremental build: {rendered} rendered, {filled} refilled, {len(pages) - len(work)} unchanged, {len(removed)} removed")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/static_site_generator/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render pages whose source, template or basepath changed",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="skip content and static files or directories matching this glob (repeatable), e.g. 'drafts' or '*.psd'",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="delete docs/ and write everything from scratch instead of updating it in place",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="update static files in place (the default unless --clean; kept for compatibility)",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="hardlink static files into docs/ instead of copying them",
+    )
+    parser.add_argument(
+        "--atomic",
+        action="store_true",
+        help="build into a staging directory and publish it with a single swap",
+    )
+    parser.add_argument(
+        "--publish",
+        choices=["rename", "symlink"],
+        default="rename",
+        help="how --atomic swaps the staging directory in (symlink makes docs/ a symlink)",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute site origin, e.g. https://example.github.io; enables sitemap.xml and blog feeds",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="publish CSS, JS and images under content-hashed names and add sizes to <img> tags",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip comments and collapse whitespace in the generated HTML",
+    )
+    parser.add_argument(
+        "--gzip",
+        nargs="?",
+        type=int,
+        const=9,
+        metavar="LEVEL",
+        help="write precompressed .gz siblings of HTML, CSS, JS and SVG outputs (level 1-9, default 9)",
+    )
+    parser.add_argument(
+        "--listings",
+        nargs="?",
+        type=int,
+        const=10,
+        metavar="PER_PAGE",
+        help="generate paginated blog/page/N/ and blog/tags/<tag>/page/N/ listings, with the newest at blog/page/ (default 10 posts per page)",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report links and images that point at nothing in the built site (no network access)",
+    )
+    parser.add_argument(
+        "--delta-from",
+        metavar="MANIFEST",
+        help="compare the output with an older deploy manifest and list changed and deleted files",
+    )
+    parser.add_argument(
+        "--bundle",
+        metavar="PATH",
+        help="with --delta-from, also write a tar (.tar.gz to compress) of only the changed files",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="stay resident and re-render pages as content, static files or the template change",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve docs/ under the basepath from this process",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="serve pages rendered on request from content/ and static/ without building docs/",
+    )
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print per-page and per-file events")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print warnings and errors")
+    parser.add_argument("--trace-file", help="append every build event to this JSON-lines file")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages",
+    )
+    args = parser.parse_args(argv)
+    if args.bundle and not args.delta_from:
+        parser.error("--bundle needs --delta-from to know which files changed")
+    return args
+
+
+def build_site(args, output_dir, writer=None):
+    """Build the site into output_dir and return (failures, broken links, asset map)."""
+    if args.clean and os.path.exists(output_dir):
+        tracer.message(INFO, f"Deleting existing directory: {output_dir}")
+        shutil.rmtree(output_dir)
+
+    # Outputs are updated in place and identical files are never rewritten,
+    # so unchanged files keep their mtimes and deploys only see real changes
+    assets = build_asset_map("static", exclude=args.exclude) if args.fingerprint else None
+    sync_static(source="static", destination=output_dir, link=args.link, names=assets.names if assets else None, exclude=args.exclude)
+
+    # A full build re-renders every page, so it starts from an empty index
+    index = SiteIndex.load(INDEX_PATH) if args.incremental else SiteIndex(INDEX_PATH)
+    try:
+        if args.incremental:
+            failures = generate_pages_incrementally("content", "template.html", output_dir, args.basepath, jobs=args.jobs, writer=writer, index=index, minify=args.minify, assets=assets, exclude=args.exclude)
+        else:
+            pages = collect_pages("content", output_dir, args.exclude)
+            failures, infos = render_pages(pages, "template.html", args.basepath, args.jobs, writer or ImmediateWriter(), args.minify, assets)
+            update_index(index, pages, infos, output_dir, UrlResolver(args.basepath).basepath)
+            record_pages(pages, failures, "template.html", output_dir, args.basepath, minify=args.minify, assets=assets)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    index.save()
+    if args.listings:
+        generate_listings(index, "template.html", output_dir, args.basepath, args.listings, args.minify, assets)
+    else:
+        remove_listings(output_dir)
+    if args.site_url:
+        site_basepath = UrlResolver(args.basepath).basepath
+        home_url = blog_entry_url(site_basepath) if args.listings else None
+        write_site_files(index, output_dir, args.site_url, site_basepath, home_url=home_url)
+    else:
+        remove_site_files(output_dir)
+    if args.gzip is not None:
+        compress_outputs(output_dir, args.gzip, max_workers=max(4, args.jobs))
     else:
-        basepath = "/static_site_generator/"  
-    
-    copy_static_to_public(source="static", destination="docs")
-    generate_pages_recursively("content", "template.html", "docs", basepath)
+        remove_compressed(output_dir)
+    broken = check_links(index, output_dir, args.basepath, assets, args.jobs) if args.check_links else []
+    write_deploy_manifest(output_dir, delta_from=args.delta_from, bundle_path=args.bundle)
+    return failures, broken, assets
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    basepath = args.basepath
+    level = DEBUG if args.verbose else tracing.WARNING if args.quiet else INFO
+    tracing.configure(level, args.trace_file)
+
+    if args.preview:
+        render_page = functools.partial(render_page_html, template_path="template.html", basepath=basepath, minify=args.minify)
+        try:
+            preview(PreviewSite("content", "static", "template.html", render_page, exclude=args.exclude), basepath, args.port)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    output_dir = "docs"
+    writer = None
+    held_cache = None
+    if args.atomic:
+        output_dir = prepare_staging("docs", args.publish)
+        writer = OutputWriter()
+        held_cache = hold_cache(CACHE_DIR)
+
+    published = False
+    try:
+        failures, broken, assets = build_site(args, output_dir, writer)
+        if args.atomic:
+            if failures or broken:
+                tracer.message(tracing.WARNING, f"Not publishing {output_dir}: the build had errors")
+            else:
+                replaced = swap_in(output_dir, "docs", args.publish)
+                # docs/ is live from here on, so its caches must be kept
+                published = True
+                tracer.message(INFO, f"Published {output_dir} -> docs")
+                discard_trees(replaced)
+    finally:
+        if held_cache is not None:
+            release_cache(held_cache, CACHE_DIR, restore=not published)
+
+    report_failures(failures)
+    report_broken_links(broken)
+
+    try:
+        if args.watch:
+            if args.serve:
+                serve("docs", basepath, args.port, background=True)
+            render_page = functools.partial(generate_page, minify=args.minify)
+            refill_page = functools.partial(fill_page, minify=args.minify)
+            watcher = SiteWatcher("content", "static", "template.html", "docs", basepath, render_page, remove_output, link=args.link, assets=assets, exclude=args.exclude, fill_page=refill_page)
+            watcher.run()
+        elif args.serve:
+            serve("docs", basepath, args.port)
+    except KeyboardInterrupt:
+        pass
+
+    if failures or broken:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+
+CACHE_DIR = ".ssg_cache"
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+BODY_CACHE_DIR = os.path.join(CACHE_DIR, "bodies")
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+class BuildManifest:
+    """Records the inputs each output page was built from.
+
+    pages maps a markdown source path to a dict with the source hash, the
+    template hash, the basepath and the output path of its last render.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, pages=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # A corrupt manifest just means a full rebuild
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pages": self.pages}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def source_hash(self, source_path):
+        """Hash a source file, skipping the read when size and mtime match."""
+        st = os.stat(source_path)
+        entry = self.pages.get(source_path)
+        if (
+            entry is not None
+            and entry.get("size") == st.st_size
+            and entry.get("mtime_ns") == st.st_mtime_ns
+        ):
+            return entry["source"]
+        return hash_file(source_path)
+
+    def record(self, source_path, source_hash, template_hash, basepath, output_path, assets=None):
+        st = os.stat(source_path)
+        self.pages[source_path] = {
+            "source": source_hash,
+            "template": template_hash,
+            "basepath": basepath,
+            "output": output_path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        if assets is not None:
+            self.pages[source_path]["assets"] = assets
+
+    def inputs(self):
+        """The recorded inputs of every page, in DependencyGraph form."""
+        return {
+            source_path: {
+                "source": entry["source"],
+                "template": entry["template"],
+                "basepath": entry["basepath"],
+                "assets": entry.get("assets"),
+            }
+            for source_path, entry in self.pages.items()
+        }
+
+    def remove_missing(self, current_sources):
+        """Forget sources that no longer exist and return their old outputs."""
+        stale_outputs = []
+        for source_path in list(self.pages):
+            if source_path not in current_sources:
+                stale_outputs.append(self.pages.pop(source_path)["output"])
+        return stale_outputs
+
+
+def body_cache_path(source_hash, basepath, cache_dir=BODY_CACHE_DIR, assets=None):
+    """Where the rendered article body for a source, basepath and asset map is cached."""
+    key = f"{source_hash}:{basepath}"
+    if assets is not None:
+        key += f":{assets}"
+    key = hash_bytes(key.encode())
+    return os.path.join(cache_dir, key + ".html")
+
+
+@contextmanager
+def save_body(path, title):
+    """Stream a rendered body into the body cache: yields a write() for its markup.
+
+    The file holds the title as a JSON line followed by the body HTML.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(title) + "\n")
+            yield f.write
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CachedBody:
+    """A body from the body cache, streamed from disk into a template slot."""
+
+    def __init__(self, path, title):
+        self.path = path
+        self.title = title
+
+    def write_html(self, write):
+        with open(self.path) as f:
+            f.readline()
+            tail = ""
+            for chunk in iter(lambda: f.read(BODY_CHUNK_SIZE), ""):
+                # Cut after the last tag, since a minifier may not see a tag split
+                chunk = tail + chunk
+                end = chunk.rfind(">") + 1
+                if end:
+                    write(chunk[:end])
+                tail = chunk[end:]
+            if tail:
+                write(tail)
+
+    def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+
+
+def load_body(path):
+    """Return the CachedBody at path, or None if it isn't there."""
+    try:
+        with open(path) as f:
+            title = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    return CachedBody(path, title)
+
+
+def prune_bodies(live_paths, cache_dir=BODY_CACHE_DIR):
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if path not in live_paths:
+            os.remove(path)
@@ -1,8 +1,10 @@
+import io
+import itertools
 from enum import Enum
 
 from htmlnode import ParentNode
 from split_nodes_delimiter import text_to_textnodes
-from textnode import TextNode, text_node_to_html_node
+from textnode import InlineTextType, TextNode, text_node_to_html_node
 
 class BlockType(Enum):
     PARAGRAPH = 1
@@ -13,64 +15,181 @@ class BlockType(Enum):
     ORDERED_LIST = 6
 
 
-def block_to_block_type(block):
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+# "1. ", "2. ", ... so ordered list checks don't format a prefix per line
+ORDERED_PREFIXES = [f"{i}. " for i in range(100)]
+
+
+def ordered_prefix(number):
+    if number < len(ORDERED_PREFIXES):
+        return ORDERED_PREFIXES[number]
+    return f"{number}. "
+
+
+def classify_block(block):
+    """Return (block_type, lines), with lines None for headings and code blocks."""
+    # The split lines are handed on so the block builders don't split again
     if not block:
-        return BlockType.PARAGRAPH
-   
-    lines = block.split("\n")
-    
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return BlockType.HEADING
-    
+        return BlockType.PARAGRAPH, [block]
+
+    if block.startswith(HEADING_PREFIXES):
+        return BlockType.HEADING, None
+
     if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
-    
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
-    
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
-    
-    is_ordered = True
+        return BlockType.CODE, None
+
+    lines = block.split("\n")
+    is_quote = is_unordered = is_ordered = True
     for i, line in enumerate(lines, start=1):
-        if not line.startswith(f"{i}. "):
+        if is_quote and not line.startswith(">"):
+            is_quote = False
+        if is_unordered and not line.startswith("- "):
+            is_unordered = False
+        if is_ordered and not line.startswith(ordered_prefix(i)):
             is_ordered = False
-            break
-    if is_ordered:
-        return BlockType.ORDERED_LIST  
-    return BlockType.PARAGRAPH
+        if not (is_quote or is_unordered or is_ordered):
+            return BlockType.PARAGRAPH, lines
 
+    if is_quote:
+        return BlockType.QUOTE, lines
+    if is_unordered:
+        return BlockType.UNORDERED_LIST, lines
+    return BlockType.ORDERED_LIST, lines
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
+
+def block_to_block_type(block):
+    return classify_block(block)[0]
+
+
+def iter_numbered_blocks(markdown):
+    """Yield (line number, block) pairs from a string or any iterable of lines."""
+    # A ``` fence stays one block even if it contains empty lines
+    if isinstance(markdown, str):
+        markdown = io.StringIO(markdown)
+    lines = []
+    start = 1
+    in_fence = False
+    for number, line in enumerate(markdown, start=1):
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            # A fence opened and closed on one line doesn't change state
+            if in_fence or len(stripped) < 6 or not stripped.endswith("```"):
+                in_fence = not in_fence
+        if line == "" and not in_fence:
+            block = "\n".join(lines).strip()
+            if block:
+                yield start, block
+            lines = []
             continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
+        if not lines:
+            start = number
+        lines.append(line)
+    block = "\n".join(lines).strip()
+    if block:
+        yield start, block
+
+
+def iter_blocks(markdown):
+    for _, block in iter_numbered_blocks(markdown):
+        yield block
+
 
-def text_to_children(text):
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown))
+
+
+def parse_front_matter(block):
+    """Return the key: value pairs of a ----fenced block, or None if it isn't one."""
+    lines = block.split("\n")
+    if len(lines) < 2 or lines[0] != "---" or lines[-1] != "---":
+        return None
+    front_matter = {}
+    for line in lines[1:-1]:
+        key, sep, value = line.partition(":")
+        if sep:
+            front_matter[key.strip().lower()] = value.strip()
+    return front_matter
+
+
+def slugify(text):
+    slug = "".join(char if char.isalnum() else "-" for char in text.lower())
+    return "-".join(part for part in slug.split("-") if part)
+
+
+class Document:
+    """Metadata gathered while a document is parsed."""
+
+    __slots__ = ("html_node", "title", "headings", "links", "images", "word_count", "slugs", "front_matter")
+
+    def __init__(self):
+        self.html_node = None
+        self.title = None
+        self.headings = []  # (level, text, slug)
+        self.links = []  # (url, line)
+        self.images = []  # (url, alt, line)
+        self.word_count = 0
+        self.slugs = set()
+        self.front_matter = {}
+
+    @property
+    def tags(self):
+        return [tag.strip() for tag in self.front_matter.get("tags", "").split(",") if tag.strip()]
+
+    def add_heading(self, level, text):
+        slug = slugify(text) or "section"
+        unique = slug
+        suffix = 2
+        while unique in self.slugs:
+            unique = f"{slug}-{suffix}"
+            suffix += 1
+        self.slugs.add(unique)
+        self.headings.append((level, text, unique))
+        if level == 1 and self.title is None:
+            self.title = text.strip()
+
+    def add_text(self, text_nodes, text, line):
+        """Count words and record links and images, with their line numbers."""
+        cursor = 0
+        for text_node in text_nodes:
+            if text_node.text_type in (InlineTextType.LINK, InlineTextType.IMAGE):
+                pos = text.find(f"]({text_node.url})", cursor)
+                cursor = max(pos, cursor)
+                link_line = line + text.count("\n", 0, cursor)
+                if text_node.text_type == InlineTextType.IMAGE:
+                    self.images.append((text_node.url, text_node.text, link_line))
+                    continue
+                self.links.append((text_node.url, link_line))
+            self.word_count += len(text_node.text.split())
+
+
+def text_to_children(text, resolver=None, doc=None, line=1):
     text_nodes = text_to_textnodes(text)
+    if doc is not None:
+        doc.add_text(text_nodes, text, line)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolver)
         children.append(html_node)
     return children
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    
-    for block in blocks:
-        block_type = block_to_block_type(block)
+def markdown_to_html_nodes(markdown, resolver=None, doc=None):
+    """Lazily yield the HTMLNode for each block, filling in doc as it goes."""
+    for line, block in iter_numbered_blocks(markdown):
+        if line == 1:
+            front_matter = parse_front_matter(block)
+            if front_matter is not None:
+                if doc is not None:
+                    doc.front_matter = front_matter
+                continue
+        block_type, lines = classify_block(block)
         
         if block_type == BlockType.PARAGRAPH:
-            child_nodes = text_to_children(block)
+            child_nodes = text_to_children(block, resolver, doc, line)
             paragraph_node = ParentNode("p", child_nodes)
-            children.append(paragraph_node)
+            yield paragraph_node
         
         elif block_type == BlockType.HEADING:
             level = 0
@@ -80,9 +199,11 @@ def markdown_to_html_node(markdown):
                 else:
                     break
             text = block[level + 1:]
-            child_nodes = text_to_children(text)
+            child_nodes = text_to_children(text, resolver, doc, line)
+            if doc is not None:
+                doc.add_heading(level, "".join(child.value for child in child_nodes))
             heading_node = ParentNode(f"h{level}", child_nodes)
-            children.append(heading_node)
+            yield heading_node
         
         elif block_type == BlockType.CODE:
             code_text = block[3:-3]
@@ -92,55 +213,76 @@ def markdown_to_html_node(markdown):
 
             code_parent = ParentNode("code", [code_html])
             pre_node = ParentNode("pre", [code_parent])
-            children.append(pre_node)
+            yield pre_node
         
         elif block_type == BlockType.QUOTE:
 
-            lines = block.split("\n")
             quote_lines = []
-            for line in lines:
+            for quote_line in lines:
 
-                if line.startswith("> "):
-                    quote_lines.append(line[2:])
-                elif line.startswith(">"):
-                    quote_lines.append(line[1:])
+                if quote_line.startswith("> "):
+                    quote_lines.append(quote_line[2:])
+                elif quote_line.startswith(">"):
+                    quote_lines.append(quote_line[1:])
             quote_text = "\n".join(quote_lines)
-            child_nodes = text_to_children(quote_text)
+            child_nodes = text_to_children(quote_text, resolver, doc, line)
             quote_node = ParentNode("blockquote", child_nodes)
-            children.append(quote_node)
+            yield quote_node
         
         elif block_type == BlockType.UNORDERED_LIST:
 
-            lines = block.split("\n")
             list_items = []
-            for line in lines:
+            for i, item_line in enumerate(lines):
 
-                item_text = line[2:]
-                item_children = text_to_children(item_text)
+                item_text = item_line[2:]
+                item_children = text_to_children(item_text, resolver, doc, line + i)
                 li_node = ParentNode("li", item_children)
                 list_items.append(li_node)
             ul_node = ParentNode("ul", list_items)
-            children.append(ul_node)
+            yield ul_node
         
         elif block_type == BlockType.ORDERED_LIST:
 
-            lines = block.split("\n")
             list_items = []
-            for line in lines:
+            for i, item_line in enumerate(lines, start=1):
 
-                dot_index = line.index(". ")
-                item_text = line[dot_index + 2:]
-                item_children = text_to_children(item_text)
+                item_text = item_line[len(ordered_prefix(i)):]
+                item_children = text_to_children(item_text, resolver, doc, line + i - 1)
                 li_node = ParentNode("li", item_children)
                 list_items.append(li_node)
             ol_node = ParentNode("ol", list_items)
-            children.append(ol_node)
-    
+            yield ol_node
+
+
+def markdown_to_html_node(markdown, resolver=None):
+    return ParentNode("div", list(markdown_to_html_nodes(markdown, resolver)))
+
+
+def parse_document(markdown, resolver=None):
+    """Parse markdown into a Document holding the HTML tree and its metadata."""
+    doc = Document()
+    doc.html_node = ParentNode("div", list(markdown_to_html_nodes(markdown, resolver, doc)))
+    return doc
+
+
+def stream_document(markdown, resolver=None):
+    """Return (Document, node iterator) with the title already known."""
+    # Blocks up to the first h1 are held back so the template can write the title first
+    doc = Document()
+    nodes = markdown_to_html_nodes(markdown, resolver, doc)
+    head = []
+    for node in nodes:
+        head.append(node)
+        if doc.title is not None:
+            break
+    if doc.title is None:
+        raise Exception("No h1 header found in markdown")
+    return doc, itertools.chain(head, nodes)
 
-    return ParentNode("div", children)
 
 def extract_title(markdown):
-    lines = markdown.split('\n')
+    # Iterating lines lazily lets this stop at the h1 without reading the rest
+    lines = io.StringIO(markdown) if isinstance(markdown, str) else markdown
     
     for line in lines:
         stripped_line = line.strip()
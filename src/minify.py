@@ -0,0 +1,79 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"<!--.*?-->|<([/!]?)([A-Za-z][\w-]*)[^>]*>|[^<]+|<", re.DOTALL)
+
+# Whitespace next to these tags never affects rendering, so it is dropped
+BLOCK_TAGS = frozenset([
+    "!doctype", "html", "head", "body", "meta", "title", "link", "style", "script",
+    "article", "section", "main", "header", "footer", "nav", "aside", "div",
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "blockquote",
+    "pre", "hr", "br", "table", "thead", "tbody", "tr", "th", "td",
+])
+
+# Content inside these tags is written exactly as it came
+PRESERVE_TAGS = frozenset(["pre", "code", "textarea", "script", "style"])
+
+
+class Minifier:
+    """A write() wrapper that minifies HTML as it streams through.
+
+    Comments are dropped, whitespace runs become a single space and
+    whitespace next to block-level tags is removed, except inside
+    <pre>, <code> and friends. State carries over between calls, so markup
+    may arrive in any number of pieces as long as no tag is split.
+    """
+
+    def __init__(self, write, after_block=True):
+        self.write = write
+        self.after_block = after_block
+        self.pending_space = False
+        self.preserve_depth = 0
+
+    def __call__(self, chunk):
+        write = self.write
+        for match in TOKEN_PATTERN.finditer(chunk):
+            token = match.group()
+            name = match.group(2)
+            if name is not None:
+                self._tag(token, match.group(1), name.lower())
+            elif token.startswith("<!--"):
+                continue
+            elif self.preserve_depth:
+                write(token)
+            else:
+                words = token.split()
+                if token[:1].isspace():
+                    self.pending_space = True
+                if not words:
+                    continue
+                if self.pending_space and not self.after_block:
+                    write(" ")
+                write(" ".join(words))
+                self.pending_space = token[-1:].isspace()
+                self.after_block = False
+
+    def _tag(self, token, kind, name):
+        if kind == "!":
+            name = "!" + name
+        is_block = name in BLOCK_TAGS
+        if self.pending_space and not is_block and not self.after_block and not self.preserve_depth:
+            self.write(" ")
+        self.pending_space = False
+        self.write(token)
+        self.after_block = is_block
+        if name in PRESERVE_TAGS and not token.endswith("/>"):
+            self.preserve_depth += -1 if kind == "/" else 1
+
+    def flush(self):
+        """Write out a trailing space that might still matter to what follows."""
+        if self.pending_space and not self.after_block:
+            self.write(" ")
+        self.pending_space = False
+
+
+def minify_html(html, after_block=True):
+    parts = []
+    minifier = Minifier(parts.append, after_block)
+    minifier(html)
+    minifier.flush()
+    return "".join(parts)
@@ -0,0 +1,275 @@
+import filecmp
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from tracing import tracer, INFO
+
+
+def write_if_changed(path, data):
+    """Write bytes to path unless it already holds exactly those bytes.
+
+    The new content is written next to the target and renamed over it, so
+    readers never see a partial file. Returns True if the file was written.
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+@contextmanager
+def open_replacing(path):
+    """Open a temp file for text next to path and rename it over path on success.
+
+    If the block raises, the temp file is deleted and path is left as it was,
+    so a page that fails halfway through never replaces a good one. Like
+    write_if_changed, a result identical to path is discarded so path keeps
+    its mtime.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            yield f
+        if os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _file_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+def remove_output(output_path, dest_dir_path):
+    if os.path.exists(output_path):
+        tracer.message(INFO, f"Removing stale output: {output_path}")
+        os.remove(output_path)
+    # Prune directories left empty, but never the output root itself
+    root = os.path.abspath(dest_dir_path)
+    directory = os.path.dirname(os.path.abspath(output_path))
+    while directory != root and directory.startswith(root) and os.path.isdir(directory):
+        if os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+class ImmediateWriter:
+    """Writes in the calling thread; used where no thread pool is wanted."""
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+
+    def write(self, path, data):
+        if isinstance(data, str):
+            data = data.encode()
+        if write_if_changed(path, data):
+            self.written += 1
+        else:
+            self.skipped += 1
+
+    @contextmanager
+    def open(self, path):
+        """Stream a text file to path through open_replacing()."""
+        before = _file_identity(path)
+        with open_replacing(path) as f:
+            yield f
+        if _file_identity(path) == before:
+            self.skipped += 1
+        else:
+            self.written += 1
+
+    def close(self):
+        pass
+
+
+class OutputWriter:
+    """Writes files on a thread pool while the caller keeps rendering.
+
+    write() blocks once max_in_flight bytes are queued but not yet on
+    disk, so a fast renderer can't buffer the whole site in memory.
+    Unchanged files are skipped. close() waits for every write and
+    re-raises the first error.
+    """
+
+    def __init__(self, max_workers=4, max_in_flight=64 * 1024 * 1024):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.written = 0
+        self.skipped = 0
+        self.condition = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+
+    def write(self, path, data):
+        if isinstance(data, str):
+            data = data.encode()
+        size = len(data)
+        with self.condition:
+            # A single file larger than the cap is still allowed through alone
+            while self.in_flight and self.in_flight + size > self.max_in_flight:
+                self.condition.wait()
+            self.in_flight += size
+        self.futures.append(self.pool.submit(self._write, path, data))
+
+    def _write(self, path, data):
+        try:
+            changed = write_if_changed(path, data)
+        finally:
+            with self.condition:
+                self.in_flight -= len(data)
+                self.condition.notify_all()
+        with self.condition:
+            if changed:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    @contextmanager
+    def open(self, path):
+        """Stream a text file to path in the calling thread, so it is never held in memory."""
+        before = _file_identity(path)
+        with open_replacing(path) as f:
+            yield f
+        with self.condition:
+            if _file_identity(path) == before:
+                self.skipped += 1
+            else:
+                self.written += 1
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        for future in self.futures:
+            future.result()
+        self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def prepare_staging(dest_dir, mode="rename"):
+    """Create a staging directory seeded with the current output.
+
+    Existing files are hardlinked rather than copied, and every write goes
+    through a rename, so the published tree is never modified in place.
+    """
+    if mode == "symlink":
+        releases_dir = f"{dest_dir}.releases"
+        os.makedirs(releases_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=time.strftime("%Y%m%d%H%M%S-"), dir=releases_dir)
+    else:
+        staging_dir = f"{dest_dir}.staging"
+        if os.path.lexists(staging_dir):
+            shutil.rmtree(staging_dir)
+        os.makedirs(staging_dir)
+    if os.path.isdir(dest_dir):
+        shutil.copytree(os.path.realpath(dest_dir), staging_dir, copy_function=os.link, dirs_exist_ok=True)
+    return staging_dir
+
+
+def remove_tree(path):
+    """Remove a directory tree, or just the link if path is a symlink."""
+    if os.path.islink(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def swap_in(staging_dir, dest_dir, mode="rename"):
+    """Make a finished staging directory the published output.
+
+    In "symlink" mode dest_dir is a symlink that is replaced in a single
+    atomic rename. In "rename" mode the old tree is moved aside and the
+    staging tree renamed into place, leaving only the instant between two
+    renames without a dest_dir. Returns the replaced trees, for
+    discard_trees() once the swap has been recorded.
+    """
+    old_dir = f"{dest_dir}.old"
+    remove_tree(old_dir)
+    # A release directory dest_dir pointed at, from an earlier symlink publish
+    previous = os.path.realpath(dest_dir) if os.path.islink(dest_dir) else None
+
+    if mode == "symlink":
+        link_tmp = f"{dest_dir}.link.tmp"
+        if os.path.lexists(link_tmp):
+            os.remove(link_tmp)
+        os.symlink(os.path.relpath(staging_dir, os.path.dirname(os.path.abspath(dest_dir))), link_tmp)
+        if os.path.isdir(dest_dir) and not os.path.islink(dest_dir):
+            # One-time switch from a plain directory to a symlink
+            os.rename(dest_dir, old_dir)
+        os.replace(link_tmp, dest_dir)
+    else:
+        if os.path.lexists(dest_dir):
+            os.rename(dest_dir, old_dir)
+        os.rename(staging_dir, dest_dir)
+
+    replaced = [old_dir]
+    if previous and previous != os.path.realpath(staging_dir):
+        replaced.append(previous)
+    return replaced
+
+
+def discard_trees(paths):
+    for path in paths:
+        remove_tree(path)
+
+
+def publish(staging_dir, dest_dir, mode="rename"):
+    """Swap staging_dir in as dest_dir and delete what it replaced."""
+    discard_trees(swap_in(staging_dir, dest_dir, mode))
+
+
+def hold_cache(cache_dir):
+    """Hardlink a copy of cache_dir aside before a staged build and return its path.
+
+    Every cache file is replaced by a rename rather than modified, so the
+    copy keeps the state that matches the published output.
+    """
+    held_dir = f"{cache_dir}.published"
+    if os.path.lexists(held_dir):
+        shutil.rmtree(held_dir)
+    if os.path.isdir(cache_dir):
+        shutil.copytree(cache_dir, held_dir, copy_function=os.link)
+    else:
+        os.makedirs(held_dir)
+    return held_dir
+
+
+def release_cache(held_dir, cache_dir, restore):
+    """Drop the held copy, first putting it back in place of cache_dir if restore is set.
+
+    A build that is not published must not leave caches describing its
+    staging tree, or the next build would skip pages it never published.
+    """
+    if not restore:
+        shutil.rmtree(held_dir)
+        return
+    if os.path.lexists(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.rename(held_dir, cache_dir)
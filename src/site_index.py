@@ -0,0 +1,206 @@
+import datetime
+import email.utils
+import json
+import os
+from xml.sax.saxutils import escape
+
+from manifest import CACHE_DIR
+from output import remove_output, write_if_changed
+
+INDEX_PATH = os.path.join(CACHE_DIR, "site_index.json")
+SITE_FILES_PATH = os.path.join(CACHE_DIR, "site_files.json")
+
+
+class PageMeta:
+    """What the build knows about one published page.
+
+    links and images are [url, line] pairs, as written in the markdown.
+    """
+
+    __slots__ = ("path", "url", "title", "date", "word_count", "links", "images", "tags")
+
+    def __init__(self, path, url, title, date, word_count=0, links=None, images=None, tags=None):
+        self.path = path
+        self.url = url
+        self.title = title
+        self.date = date
+        self.word_count = word_count
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+        self.tags = tags if tags is not None else []
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __eq__(self, other):
+        if not isinstance(other, PageMeta):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PageMeta({self.path}, {self.url}, {self.title})"
+
+
+def page_url(dest_path, dest_dir, basepath="/"):
+    """The published URL of an output file, e.g. /blog/tom/ for blog/tom/index.html."""
+    rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        rel_path = ""
+    elif rel_path.endswith("/index.html"):
+        rel_path = rel_path[:-len("index.html")]
+    return basepath + rel_path
+
+
+def file_date(path):
+    mtime = os.stat(path).st_mtime
+    return datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def normalize_date(value):
+    """Turn a front matter date such as 2024-05-01 into the index's UTC timestamp form."""
+    date = datetime.datetime.fromisoformat(value)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date.isoformat(timespec="seconds")
+
+
+class SiteIndex:
+    """Per-page metadata for the whole site, kept between builds.
+
+    Entries are keyed by source path. Incremental builds update only the
+    pages they re-rendered, so feeds and the sitemap never need a walk
+    over the content.
+    """
+
+    def __init__(self, path=INDEX_PATH, pages=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        return cls(path, {source: PageMeta.from_dict(meta) for source, meta in data.get("pages", {}).items()})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pages": {source: meta.to_dict() for source, meta in self.pages.items()}}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def update(self, meta):
+        self.pages[meta.path] = meta
+
+    def retain(self, sources):
+        """Drop entries whose source is not in sources."""
+        for source in list(self.pages):
+            if source not in sources:
+                del self.pages[source]
+
+    def sorted_pages(self, url_prefix=None):
+        pages = [meta for meta in self.pages.values() if url_prefix is None or meta.url.startswith(url_prefix)]
+        return sorted(pages, key=lambda meta: (meta.date, meta.url), reverse=True)
+
+
+def build_sitemap(index, site_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for meta in sorted(index.pages.values(), key=lambda meta: meta.url):
+        lines.append(f"  <url><loc>{escape(site_url + meta.url)}</loc><lastmod>{meta.date}</lastmod></url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def build_atom_feed(pages, site_url, title, feed_url, home_url=None):
+    updated = pages[0].date if pages else "1970-01-01T00:00:00+00:00"
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f'  <link href="{escape(feed_url)}" rel="self"/>',
+        f"  <id>{escape(feed_url)}</id>",
+        f"  <updated>{updated}</updated>",
+    ]
+    if home_url:
+        lines.insert(4, f'  <link href="{escape(home_url)}" rel="alternate"/>')
+    for meta in pages:
+        url = escape(site_url + meta.url)
+        lines.append(
+            f'  <entry><title>{escape(meta.title)}</title><link href="{url}"/>'
+            f"<id>{url}</id><updated>{meta.date}</updated></entry>"
+        )
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def build_rss_feed(pages, site_url, title, home_url):
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<rss version="2.0"><channel>',
+        f"  <title>{escape(title)}</title>",
+        f"  <link>{escape(home_url)}</link>",
+        f"  <description>{escape(title)}</description>",
+    ]
+    for meta in pages:
+        url = escape(site_url + meta.url)
+        published = email.utils.format_datetime(datetime.datetime.fromisoformat(meta.date))
+        lines.append(
+            f"  <item><title>{escape(meta.title)}</title><link>{url}</link>"
+            f"<guid>{url}</guid><pubDate>{published}</pubDate></item>"
+        )
+    lines.append("</channel></rss>")
+    return "\n".join(lines) + "\n"
+
+
+def write_site_files(index, dest_dir, site_url, basepath="/", blog_dir="blog", feed_title="Blog", home_url=None, record_path=SITE_FILES_PATH):
+    """Write sitemap.xml plus Atom and RSS feeds for the blog section.
+
+    The feeds link to home_url (a site path such as the listing entry
+    page), or to the blog directory when it is not given. The files
+    written are listed in record_path for remove_site_files().
+    """
+    site_url = site_url.rstrip("/")
+    write_if_changed(os.path.join(dest_dir, "sitemap.xml"), build_sitemap(index, site_url).encode())
+
+    blog_url = f"{basepath}{blog_dir}/"
+    posts = [meta for meta in index.sorted_pages(blog_url) if meta.url != blog_url]
+    feed_dir = os.path.join(dest_dir, blog_dir)
+    home_url = site_url + (home_url or blog_url)
+    atom = build_atom_feed(posts, site_url, feed_title, f"{site_url}{blog_url}feed.xml", home_url)
+    write_if_changed(os.path.join(feed_dir, "feed.xml"), atom.encode())
+    rss = build_rss_feed(posts, site_url, feed_title, home_url)
+    write_if_changed(os.path.join(feed_dir, "rss.xml"), rss.encode())
+
+    files = ["sitemap.xml", f"{blog_dir}/feed.xml", f"{blog_dir}/rss.xml"]
+    os.makedirs(os.path.dirname(record_path), exist_ok=True)
+    tmp_path = record_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": files}, f, indent=1)
+    os.replace(tmp_path, record_path)
+
+
+def remove_site_files(dest_dir, record_path=SITE_FILES_PATH):
+    """Delete the sitemap and feeds an earlier build wrote, for builds without --site-url.
+
+    Returns the number of files removed.
+    """
+    try:
+        with open(record_path) as f:
+            files = json.load(f).get("files", [])
+    except (OSError, ValueError):
+        return 0
+    removed = 0
+    for rel_path in files:
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.exists(dest_path):
+            remove_output(dest_path, dest_dir)
+            removed += 1
+    os.remove(record_path)
+    return removed
@@ -24,91 +24,99 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+INLINE_DELIMITERS = {
+    "**": InlineTextType.BOLD,
+    "_": InlineTextType.ITALIC,
+    "`": InlineTextType.CODE,
+}
+INLINE_TOKEN_PATTERN = re.compile(r"\*\*|_|`|!?\[")
+
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
-def split_nodes_image(old_nodes):
+
+def split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
-    
     for old_node in old_nodes:
         if old_node.text_type != InlineTextType.PLAIN:
             new_nodes.append(old_node)
             continue
-        
-        images = extract_markdown_images(old_node.text)
-        
-        if not images:
+
+        last = 0
+        for match in pattern.finditer(old_node.text):
+            if match.start() > last:
+                new_nodes.append(TextNode(old_node.text[last:match.start()], InlineTextType.PLAIN))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            last = match.end()
+
+        if last == 0:
             new_nodes.append(old_node)
-            continue
-        
-        remaining_text = old_node.text
-        for alt_text, url in images:
-            sections = remaining_text.split(f"![{alt_text}]({url})", 1)
-            
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], InlineTextType.PLAIN))
-            
-            new_nodes.append(TextNode(alt_text, InlineTextType.IMAGE, url))
-            
-            remaining_text = sections[1] if len(sections) > 1 else ""
-        
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, InlineTextType.PLAIN))
-    
+        elif last < len(old_node.text):
+            new_nodes.append(TextNode(old_node.text[last:], InlineTextType.PLAIN))
     return new_nodes
 
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, InlineTextType.IMAGE)
+
+
 def split_nodes_link(old_nodes):
-    
-    new_nodes = []
-    
-    for old_node in old_nodes:
-        if old_node.text_type != InlineTextType.PLAIN:
-            new_nodes.append(old_node)
-            continue
-        
-        links = extract_markdown_links(old_node.text)
-        
-        if not links:
-            new_nodes.append(old_node)
-            continue
-        
-        remaining_text = old_node.text
-        for anchor_text, url in links:
-            sections = remaining_text.split(f"[{anchor_text}]({url})", 1)
-            
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], InlineTextType.PLAIN))
-            
-            new_nodes.append(TextNode(anchor_text, InlineTextType.LINK, url))
-            
-            remaining_text = sections[1] if len(sections) > 1 else ""
-        
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, InlineTextType.PLAIN))
-    
-    return new_nodes
-    
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, InlineTextType.LINK)
+
 
 def text_to_textnodes(text):
+    """Tokenize inline markdown in a single left-to-right scan.
 
-    
-    nodes = [TextNode(text, InlineTextType.PLAIN)]
-    
-    nodes = split_nodes_delimiter(nodes, "**", InlineTextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", InlineTextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", InlineTextType.CODE)
-    
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    
-    return nodes
+    Produces the same nodes as running split_nodes_delimiter for **, _
+    and ` followed by split_nodes_image and split_nodes_link, without
+    building an intermediate node list per pass. The first marker found
+    wins, so underscores inside link URLs or code spans are left alone.
+    """
+    nodes = []
+    plain_start = 0
+    pos = 0
+    while True:
+        match = INLINE_TOKEN_PATTERN.search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+
+        if token in INLINE_DELIMITERS:
+            end = text.find(token, match.end())
+            if end == -1:
+                raise ValueError("invalid markdown, formatted section not closed")
+            inner = text[match.end():end]
+            node = TextNode(inner, INLINE_DELIMITERS[token]) if inner else None
+            next_pos = end + len(token)
+        else:
+            if token == "![":
+                found = IMAGE_PATTERN.match(text, start)
+                text_type = InlineTextType.IMAGE
+            else:
+                found = LINK_PATTERN.match(text, start)
+                text_type = InlineTextType.LINK
+            if found is None:
+                # Not a complete image or link, so the bracket is plain text
+                pos = match.end()
+                continue
+            node = TextNode(found.group(1), text_type, found.group(2))
+            next_pos = found.end()
+
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], InlineTextType.PLAIN))
+        if node is not None:
+            nodes.append(node)
+        plain_start = pos = next_pos
 
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], InlineTextType.PLAIN))
+    return nodes
@@ -0,0 +1,121 @@
+import html
+import os
+import re
+
+from minify import Minifier, minify_html
+
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Slot name -> whether its value is HTML-escaped before it is inserted
+SLOTS = {
+    "Title": True,
+    "Content": False,
+}
+
+
+class TemplateError(Exception):
+    pass
+
+
+class CompiledTemplate:
+    """A template split into static segments around its {{ Slot }} names.
+
+    segments always has one more entry than slots, so rendering is a
+    single join of segments interleaved with the slot values.
+    """
+
+    def __init__(self, segments, slots, minify=False):
+        self.segments = segments
+        self.slots = slots
+        self.minify = minify
+
+    @classmethod
+    def compile(cls, source):
+        segments = []
+        slots = []
+        last = 0
+        for match in SLOT_PATTERN.finditer(source):
+            name = match.group(1)
+            if name not in SLOTS:
+                raise TemplateError(f"unknown template placeholder: {{{{ {name} }}}}")
+            segments.append(source[last:match.start()])
+            slots.append(name)
+            last = match.end()
+        segments.append(source[last:])
+
+        missing = [name for name in SLOTS if name not in slots]
+        if missing:
+            raise TemplateError(f"template is missing placeholder(s): {', '.join(missing)}")
+        return cls(segments, slots)
+
+    def with_urls(self, resolver):
+        """Return a copy whose static href/src attributes go through resolver."""
+        segments = [resolver.rewrite_attributes(segment) for segment in self.segments]
+        return CompiledTemplate(segments, self.slots, self.minify)
+
+    def minified(self):
+        """Return a copy with minified segments that also minifies HTML slot values.
+
+        The template itself is minified once here; slot content is minified
+        as it is streamed out, so no finished page is ever rescanned.
+        """
+        segments = [minify_html(segment, after_block=i == 0) for i, segment in enumerate(self.segments)]
+        return CompiledTemplate(segments, self.slots, minify=True)
+
+    def render(self, **values):
+        parts = []
+        self.write(parts.append, **values)
+        return "".join(parts)
+
+    def write(self, write, **values):
+        """Stream the filled template to write().
+
+        A slot value may be an HTMLNode, in which case its markup is
+        serialized straight into the output instead of being built as a
+        separate string first.
+        """
+        write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values[slot]
+            if SLOTS[slot]:
+                write(html.escape(value, quote=False))
+            elif self.minify:
+                minifier = Minifier(write, after_block=False)
+                if hasattr(value, "write_html"):
+                    value.write_html(minifier)
+                else:
+                    minifier(value)
+                minifier.flush()
+            elif hasattr(value, "write_html"):
+                value.write_html(write)
+            else:
+                write(value)
+            write(segment)
+
+    def __repr__(self):
+        return f"CompiledTemplate(slots: {self.slots})"
+
+
+_template_cache = {}
+
+
+def load_template(template_path, resolver=None, minify=False):
+    """Compile a template file once, recompiling only when its mtime changes.
+
+    When a resolver is given the template's own URLs are resolved once at
+    compile time, so rendering never has to rewrite them. With minify the
+    template is minified once and fills minify their content as they go.
+    """
+    key = (os.path.abspath(template_path), resolver.cache_key if resolver is not None else None, minify)
+    mtime = os.stat(template_path).st_mtime_ns
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(template_path) as f:
+        compiled = CompiledTemplate.compile(f.read())
+    if resolver is not None:
+        compiled = compiled.with_urls(resolver)
+    if minify:
+        compiled = compiled.minified()
+    _template_cache[key] = (mtime, compiled)
+    return compiled
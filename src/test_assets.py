@@ -0,0 +1,60 @@
+import os
+import unittest
+from assets import scan_files, sync_static
+from testutil import TempDirTestCase
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "cache", "assets.json")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def sync(self, **kwargs):
+        return sync_static(self.source, self.dest, self.manifest_path, **kwargs)
+
+    def test_scan_files(self):
+        self.assertEqual(sorted(scan_files(self.source)), ["images/a.png", "index.css"])
+
+    def test_first_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0))
+        with open(os.path.join(self.dest, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync(), (0, 0))
+        self.assertEqual(self.sync(compare="hash"), (0, 0))
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(os.path.join(self.source, "index.css"), "body { color: red; }")
+        self.assertEqual(self.sync(), (1, 0))
+
+    def test_removed_source_is_deleted_but_pages_are_kept(self):
+        self.sync()
+        self.write(os.path.join(self.dest, "index.html"), "<html></html>")
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_renamed_outputs(self):
+        self.sync(names={"index.css": "index.abc.css"})
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.abc.css")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(self.sync(names={"index.css": "index.def.css"}), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.abc.css")))
+
+    def test_link_mode(self):
+        self.sync(link=True)
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        dest_stat = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertEqual(source_stat.st_ino, dest_stat.st_ino)
+
+
+if __name__ == "__main__":
+    unittest.main()
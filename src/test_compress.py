@@ -0,0 +1,54 @@
+import gzip
+import os
+import unittest
+from compress import compress_outputs, remove_compressed
+from testutil import TempDirTestCase
+
+
+class TestCompressOutputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "cache", "gzip.json")
+        self.write("index.html", "<p>home</p>")
+        self.write("blog/a/index.html", "<p>a</p>")
+        self.write("index.css", "body {}")
+        self.write("images/a.png", "png")
+
+    def write(self, rel_path, text):
+        super().write(os.path.join(self.dest, rel_path), text)
+
+    def compress(self, level=9):
+        return compress_outputs(self.dest, level, max_workers=2, manifest_path=self.manifest)
+
+    def test_writes_siblings(self):
+        self.assertEqual(self.compress(), (3, 0))
+        with gzip.open(os.path.join(self.dest, "blog/a/index.html.gz")) as f:
+            self.assertEqual(f.read(), b"<p>a</p>")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images/a.png.gz")))
+
+    def test_only_changed_files(self):
+        self.compress()
+        self.assertEqual(self.compress(), (0, 0))
+        self.write("index.css", "body { margin: 0 }")
+        self.assertEqual(self.compress(), (1, 0))
+        self.assertEqual(self.compress(level=6), (3, 0))
+
+    def test_removes_stale_siblings(self):
+        self.compress()
+        os.remove(os.path.join(self.dest, "blog/a/index.html"))
+        self.assertEqual(self.compress(), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog/a/index.html.gz")))
+
+
+    def test_remove_compressed(self):
+        self.compress()
+        self.assertEqual(remove_compressed(self.dest, self.manifest), 3)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertFalse(os.path.exists(self.manifest))
+        self.assertEqual(remove_compressed(self.dest, self.manifest), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
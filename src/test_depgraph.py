@@ -0,0 +1,38 @@
+import unittest
+from depgraph import DependencyGraph, FILL, RENDER, SKIP
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.add_page("index.md", source="s1", template="t1", basepath="/")
+        self.graph.add_page("blog/tom.md", source="s2", template="t1", basepath="/")
+        self.previous = {
+            "index.md": {"source": "s1", "template": "t1", "basepath": "/"},
+            "blog/tom.md": {"source": "s2", "template": "t1", "basepath": "/"},
+        }
+
+    def test_unchanged_pages_are_skipped(self):
+        self.assertEqual(self.graph.plan(self.previous), {"index.md": SKIP, "blog/tom.md": SKIP})
+
+    def test_template_change_only_refills(self):
+        self.previous["index.md"]["template"] = "t0"
+        self.assertEqual(self.graph.plan(self.previous)["index.md"], FILL)
+
+    def test_source_change_renders(self):
+        self.previous["blog/tom.md"]["source"] = "old"
+        self.previous["blog/tom.md"]["template"] = "t0"
+        self.assertEqual(self.graph.plan(self.previous)["blog/tom.md"], RENDER)
+
+    def test_new_page_renders(self):
+        self.graph.add_page("contact.md", source="s3", template="t1", basepath="/")
+        self.assertEqual(self.graph.plan(self.previous)["contact.md"], RENDER)
+
+    def test_include_change_renders(self):
+        self.graph.add_input("index.md", "include:nav.md", "n1")
+        self.assertEqual(self.graph.changed_inputs("index.md", self.previous), {"include:nav.md"})
+        self.assertEqual(self.graph.plan(self.previous)["index.md"], RENDER)
+
+
+if __name__ == "__main__":
+    unittest.main()
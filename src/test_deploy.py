@@ -0,0 +1,70 @@
+import json
+import os
+import tarfile
+import unittest
+from deploy import BUNDLE_DELTA_NAME, build_deploy_manifest, diff_manifests, write_deploy_manifest
+from testutil import TempDirTestCase
+
+
+class TestDeployManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "cache", "deploy.json")
+        self.delta = os.path.join(self.tmp.name, "cache", "delta.json")
+        self.write("index.html", "<p>home</p>")
+        self.write("blog/a/index.html", "<p>a</p>")
+        self.write("index.css", "body {}")
+
+    def write(self, rel_path, text):
+        super().write(os.path.join(self.dest, rel_path), text)
+
+    def deploy(self, **kwargs):
+        return write_deploy_manifest(self.dest, self.manifest, delta_path=self.delta, **kwargs)
+
+    def test_manifest_entries(self):
+        files = build_deploy_manifest(self.dest)
+        self.assertEqual(sorted(files), ["blog/a/index.html", "index.css", "index.html"])
+        self.assertEqual(files["index.css"]["size"], 7)
+        self.assertEqual(len(files["index.css"]["sha256"]), 64)
+
+    def test_unchanged_files_are_not_rehashed(self):
+        previous = build_deploy_manifest(self.dest)
+        previous["index.css"]["sha256"] = "cached"
+        self.assertEqual(build_deploy_manifest(self.dest, previous)["index.css"]["sha256"], "cached")
+
+    def test_diff(self):
+        old = {"a": {"size": 1, "sha256": "x"}, "b": {"size": 1, "sha256": "y"}, "c": {"size": 1, "sha256": "z"}}
+        new = {"a": {"size": 1, "sha256": "x"}, "b": {"size": 1, "sha256": "Y"}, "d": {"size": 1, "sha256": "w"}}
+        self.assertEqual(diff_manifests(old, new), (["b", "d"], ["c"]))
+
+    def test_delta_and_bundle(self):
+        self.assertIsNone(self.deploy())
+
+        self.write("index.css", "body { margin: 0 }")
+        os.remove(os.path.join(self.dest, "blog/a/index.html"))
+        self.write("contact/index.html", "<p>contact</p>")
+        bundle = os.path.join(self.tmp.name, "delta.tar.gz")
+        changed, deleted = self.deploy(delta_from=self.manifest, bundle_path=bundle)
+        self.assertEqual((changed, deleted), (["contact/index.html", "index.css"], ["blog/a/index.html"]))
+        with open(self.delta) as f:
+            self.assertEqual(json.load(f)["deleted"], ["blog/a/index.html"])
+
+        with tarfile.open(bundle) as tar:
+            self.assertEqual(sorted(tar.getnames()), [BUNDLE_DELTA_NAME, "contact/index.html", "index.css"])
+            self.assertEqual(tar.extractfile("index.css").read(), b"body { margin: 0 }")
+
+
+    def test_delta_is_replaced_not_rewritten(self):
+        self.deploy()
+        self.deploy(delta_from=self.manifest)
+        held = self.delta + ".held"
+        os.link(self.delta, held)
+        self.write("index.html", "<p>home, edited</p>")
+        self.deploy(delta_from=self.manifest)
+        with open(held) as f:
+            self.assertEqual(json.load(f), {"changed": [], "deleted": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import http.client
+import os
+import unittest
+from devserver import ByteLRU, PreviewSite, preview
+from testutil import TempDirTestCase
+
+
+class TestByteLRU(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = ByteLRU(max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        self.assertEqual(cache.get("a"), b"1234")
+        cache.put("c", b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertEqual(cache.size, 8)
+
+    def test_skips_oversized_values(self):
+        cache = ByteLRU(max_bytes=3)
+        cache.put("a", b"1234")
+        self.assertEqual(len(cache), 0)
+
+
+class TestPreviewServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "")
+        self.renders = []
+        self.site = PreviewSite(self.content, self.static, self.template, self.render_page)
+        self.server = preview(self.site, "/site/", port=0, background=True)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def render_page(self, source_path):
+        self.renders.append(source_path)
+        with open(source_path) as f:
+            return f"<h1>{f.read()[2:]}</h1>"
+
+    def get(self, path, headers=None):
+        connection = http.client.HTTPConnection("localhost", self.server.server_address[1])
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_page_rendered_once_and_revalidated(self):
+        response, body = self.get("/site/")
+        self.assertEqual((response.status, body), (200, b"<h1>Home</h1>"))
+        etag = response.getheader("ETag")
+        self.assertEqual(self.get("/site/")[1], b"<h1>Home</h1>")
+        self.assertEqual(len(self.renders), 1)
+        response, body = self.get("/site/", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+
+    def test_edit_changes_etag(self):
+        etag = self.get("/site/")[0].getheader("ETag")
+        self.write(os.path.join(self.content, "index.md"), "# Changed")
+        response, body = self.get("/site/", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (200, b"<h1>Changed</h1>"))
+
+    def test_directory_redirect(self):
+        response, _ = self.get("/site/blog/tom")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/site/blog/tom/"))
+
+    def test_static_file(self):
+        response, body = self.get("/site/index.css")
+        self.assertEqual((response.status, body), (200, b"body {}"))
+        self.assertEqual(response.getheader("Content-Type"), "text/css")
+        response, _ = self.get("/site/index.css", {"If-None-Match": response.getheader("ETag")})
+        self.assertEqual(response.status, 304)
+
+    def test_paths_outside_the_site(self):
+        secret = os.path.join(self.tmp.name, "secret", "index.md")
+        self.write(secret, "# Secret")
+        for path in [
+            "/site//etc/passwd",
+            "/site/%2Fetc%2Fpasswd",
+            "/site/%2fetc/passwd",
+            "/site/..%2F..%2Fetc/passwd",
+            "/site/%2E%2E/secret/",
+            "/site/images/..//etc/passwd",
+            "/site/" + os.path.dirname(secret).replace("/", "%2F") + "/",
+            "/site//" + os.path.dirname(secret).lstrip("/") + "/",
+        ]:
+            response, body = self.get(path)
+            self.assertEqual(response.status, 404, path)
+            self.assertNotIn(b"root:", body)
+        self.assertEqual(self.renders, [])
+
+    def test_symlink_out_of_static(self):
+        os.symlink("/etc/passwd", os.path.join(self.static, "passwd"))
+        self.assertEqual(self.get("/site/passwd")[0].status, 404)
+
+    def test_excluded_files(self):
+        self.write(os.path.join(self.content, "drafts", "wip", "index.md"), "# Draft")
+        self.write(os.path.join(self.content, "notes.md"), "# Notes")
+        self.write(os.path.join(self.static, "drafts", "a.png"), "")
+        self.write(os.path.join(self.static, "site.css.map"), "")
+        self.site.exclude = ["drafts", "*.map", "notes.md"]
+        for path in ["/site/drafts/wip/", "/site/drafts/wip/index.html", "/site/notes.html", "/site/drafts/a.png", "/site/site.css.map"]:
+            self.assertEqual(self.get(path)[0].status, 404, path)
+        self.assertEqual(self.renders, [])
+        self.assertEqual(self.get("/site/blog/tom/")[0].status, 200)
+
+    def test_missing(self):
+        self.assertEqual(self.get("/site/nope.png")[0].status, 404)
+        self.assertEqual(self.get("/other/")[0].status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import struct
+import tempfile
+import unittest
+from fingerprint import AssetMap, build_asset_map, fingerprinted_name, image_size
+from testutil import TempDirTestCase
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+class TestImageSize(TempDirTestCase):
+    def size_of(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png_header(640, 480)), (640, 480))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 8), (32, 16))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 300, 400) + b"\x00" * 10
+        self.assertEqual(self.size_of(b"\xff\xd8" + app0 + sof), (400, 300))
+
+    def test_webp(self):
+        vp8x = b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (99).to_bytes(3, "little") + (49).to_bytes(3, "little")
+        self.assertEqual(self.size_of(vp8x), (100, 50))
+        lossless = b"RIFF\x00\x00\x00\x00WEBPVP8L" + b"\x00" * 4 + bytes([0x2F, 0x63, 0x00, 0x00, 0x00]) + b"\x00" * 8
+        self.assertEqual(self.size_of(lossless), (100, 1))
+
+    def test_unknown(self):
+        self.assertIsNone(self.size_of(b"not an image"))
+
+
+class TestAssetMap(unittest.TestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/a.png", "3f9a1c2b99"), "images/a.3f9a1c2b.png")
+
+    def test_published_path(self):
+        assets = AssetMap({"index.css": "index.1234abcd.css"})
+        self.assertEqual(assets.published_path("index.css?v=1"), "index.1234abcd.css?v=1")
+        self.assertEqual(assets.published_path("blog/tom"), "blog/tom")
+
+    def test_build_asset_map(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static = os.path.join(tmp, "static")
+            os.makedirs(os.path.join(static, "images"))
+            with open(os.path.join(static, "index.css"), "w") as f:
+                f.write("body {}")
+            with open(os.path.join(static, "images", "a.png"), "wb") as f:
+                f.write(png_header(10, 20))
+            with open(os.path.join(static, "robots.txt"), "w") as f:
+                f.write("")
+            cache = os.path.join(tmp, "cache", "asset_map.json")
+
+            assets = build_asset_map(static, cache)
+            self.assertEqual(set(assets.names), {"index.css", "images/a.png"})
+            self.assertRegex(assets.names["index.css"], r"^index\.[0-9a-f]{8}\.css$")
+            self.assertEqual(assets.image_size("images/a.png"), (10, 20))
+
+            self.assertEqual(build_asset_map(static, cache).digest, assets.digest)
+            with open(os.path.join(static, "index.css"), "w") as f:
+                f.write("body { margin: 0 }")
+            self.assertNotEqual(build_asset_map(static, cache).digest, assets.digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
+import io
 import unittest
-from htmlnode import LeafNode, ParentNode, HTMLNode
+from htmlnode import LeafNode, ParentNode, HTMLNode, StreamingParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -108,6 +109,52 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_render_to_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a "), LeafNode("a", "link", {"href": "/x"})]),
+                ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])]),
+            ],
+        )
+        out = io.StringIO()
+        node.render_to(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+        self.assertEqual(
+            out.getvalue(),
+            '<div><p>a <a href="/x">link</a></p><ul><li>item</li></ul></div>',
+        )
+
+    def test_deeply_nested_tree(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(html.count("</span>"), 5000)
+
+    def test_parent_without_children_raises(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_tuple_props(self):
+        node = LeafNode("img", "", (("src", "/a.png"), ("alt", "A")))
+        self.assertEqual(node.to_html(), '<img src="/a.png" alt="A"></img>')
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in [HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tags_are_interned(self):
+        level = 2
+        self.assertIs(ParentNode(f"h{level}", []).tag, ParentNode("h2", []).tag)
+
+    def test_streaming_parent_consumes_iterator(self):
+        children = (LeafNode("li", str(i)) for i in range(3))
+        node = StreamingParentNode("ul", children)
+        self.assertEqual(node.to_html(), "<ul><li>0</li><li>1</li><li>2</li></ul>")
+
 
 if __name__ == "__main__":
     unittest.main()
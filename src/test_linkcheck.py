@@ -0,0 +1,72 @@
+import os
+import unittest
+from fingerprint import AssetMap
+from linkcheck import check_links, site_targets
+from site_index import PageMeta, SiteIndex
+from testutil import TempDirTestCase
+
+
+class TestCheckLinks(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        for rel_path in ["index.html", "blog/tom/index.html", "blog/ann/index.html", "images/a.1234abcd.png", "index.css"]:
+            self.write(os.path.join(self.dest, rel_path), "")
+        self.index = SiteIndex(os.path.join(self.tmp.name, "index.json"))
+
+    def add_page(self, source, links=(), images=(), url="/"):
+        self.index.update(PageMeta(source, url, "T", "2025-01-01T00:00:00+00:00", 0, list(links), list(images)))
+
+    def test_site_targets(self):
+        targets = site_targets(self.dest)
+        for path in ["", "index.html", "blog/tom", "blog/tom/", "blog/tom/index.html", "index.css"]:
+            self.assertIn(path, targets)
+
+    def test_reports_broken_references(self):
+        self.add_page(
+            "content/index.md",
+            links=[["/blog/tom", 3], ["blog/tom/#top", 4], ["/blog/tim", 5], ["https://example.com/x", 6], ["#top", 7]],
+            images=[["/images/missing.png", 8]],
+        )
+        self.add_page("content/contact/index.md", links=[["/index.css?v=2", 1], ["/site/blog/tom", 2]])
+        broken = check_links(self.index, self.dest, "/site/")
+        self.assertEqual(
+            broken,
+            [
+                ("content/contact/index.md", 2, "link", "/site/blog/tom"),
+                ("content/index.md", 5, "link", "/blog/tim"),
+                ("content/index.md", 8, "image", "/images/missing.png"),
+            ],
+        )
+
+    def test_page_relative_references(self):
+        self.add_page(
+            "content/blog/ann/index.md",
+            links=[["../tom/", 1], ["./", 2], ["?q=1", 3], ["../../index.css", 4], ["../../../tom", 5], ["../tam/", 6]],
+            url="/site/blog/ann/",
+        )
+        broken = check_links(self.index, self.dest, "/site/")
+        self.assertEqual(
+            broken,
+            [
+                ("content/blog/ann/index.md", 5, "link", "../../../tom"),
+                ("content/blog/ann/index.md", 6, "link", "../tam/"),
+            ],
+        )
+
+    def test_fingerprinted_assets(self):
+        self.add_page("content/index.md", images=[["/images/a.png", 1]])
+        assets = AssetMap({"images/a.png": "images/a.1234abcd.png"})
+        self.assertEqual(check_links(self.index, self.dest, "/", assets), [])
+        self.assertEqual(len(check_links(self.index, self.dest, "/")), 1)
+
+    def test_worker_pool(self):
+        for i in range(20):
+            self.add_page(f"content/p{i}.md", links=[["/blog/tom", 1], [f"/missing{i}", 2]])
+        broken = check_links(self.index, self.dest, "/", jobs=2)
+        self.assertEqual(len(broken), 20)
+        self.assertEqual(broken[0], ("content/p0.md", 2, "link", "/missing0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import unittest
+from listings import generate_listings, listing_pages, paginate, remove_listings
+from site_index import PageMeta, SiteIndex
+from testutil import TempDirTestCase
+
+
+def post(i, tags=()):
+    return PageMeta(f"content/blog/p{i}/index.md", f"/blog/p{i}/", f"Post {i}", f"2025-01-{i + 1:02d}T00:00:00+00:00", tags=list(tags))
+
+
+class TestListings(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.cache = os.path.join(self.tmp.name, "cache", "listings.json")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.index = SiteIndex(os.path.join(self.tmp.name, "index.json"))
+
+    def generate(self):
+        return generate_listings(self.index, self.template, self.dest, "/", 3, cache_path=self.cache)
+
+    def test_paginate_from_oldest(self):
+        self.assertEqual(paginate([7, 6, 5, 4, 3, 2, 1], 3), [[3, 2, 1], [6, 5, 4], [7]])
+
+    def test_listing_pages(self):
+        for i in range(4):
+            self.index.update(post(i, ["Python"] if i % 2 else []))
+        self.index.update(PageMeta("content/blog/index.md", "/blog/", "Blog", "2025-02-01T00:00:00+00:00"))
+        listings = listing_pages(self.index, "/", page_size=3)
+        self.assertEqual(
+            sorted(listings),
+            [
+                "blog/page/1/index.html",
+                "blog/page/2/index.html",
+                "blog/page/index.html",
+                "blog/tags/python/page/1/index.html",
+                "blog/tags/python/page/index.html",
+            ],
+        )
+        self.assertEqual(listings["blog/page/index.html"], listings["blog/page/2/index.html"])
+        base, title, number, count, posts = listings["blog/page/1/index.html"]
+        self.assertEqual([meta.title for meta in posts], ["Post 2", "Post 1", "Post 0"])
+        self.assertEqual((number, count), (1, 2))
+        self.assertEqual([meta.title for meta in listings["blog/tags/python/page/1/index.html"][4]], ["Post 3", "Post 1"])
+
+    def test_new_post_renders_only_the_newest_pages(self):
+        for i in range(7):
+            self.index.update(post(i))
+        self.assertEqual(self.generate(), (4, 0))
+        self.assertEqual(self.generate(), (0, 0))
+
+        # Only the newest page and the entry page that mirrors it change
+        self.index.update(post(7))
+        self.assertEqual(self.generate(), (2, 0))
+        self.index.update(post(8))
+        self.index.update(post(9))
+        # Page 3 fills up and page 4 starts, so page 3 gains a "newer" link
+        self.assertEqual(self.generate(), (3, 0))
+        with open(os.path.join(self.dest, "blog/page/3/index.html")) as f:
+            page = f.read()
+        self.assertIn('href="/blog/page/4/"', page)
+        self.assertIn('href="/blog/page/"', page)
+        with open(os.path.join(self.dest, "blog/page/index.html")) as f:
+            entry = f.read()
+        self.assertIn("<title>Blog</title>", entry)
+        self.assertIn('href="/blog/p9/"', entry)
+        self.assertIn('href="/blog/page/3/"', entry)
+
+    def test_stale_listings_removed(self):
+        self.index.update(post(0, ["a"]))
+        self.generate()
+        self.index.update(post(0))
+        self.assertEqual(self.generate(), (0, 2))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog/tags/a")))
+
+
+    def test_remove_listings(self):
+        self.index.update(post(0, ["a"]))
+        self.generate()
+        self.assertEqual(remove_listings(self.dest, self.cache), 4)
+        self.assertEqual(os.listdir(self.dest), [])
+        self.assertFalse(os.path.exists(self.cache))
+        self.assertEqual(remove_listings(self.dest, self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
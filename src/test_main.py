@@ -0,0 +1,180 @@
+import contextlib
+import io
+import os
+import re
+import unittest
+
+import tracing
+from main import _render_page_job, collect_pages, generate_page, generate_pages_incrementally, main, parse_args, record_pages, render_pages, run_jobs
+from testutil import TempDirTestCase
+
+
+class TestAtomicBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.addCleanup(tracing.configure, tracing.OFF)
+        os.makedirs("static")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/contact/index.md", "# Contact")
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def build(self, *argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            try:
+                main(["-q", *argv])
+            except SystemExit as e:
+                return e.code
+        return 0
+
+    def test_unpublished_build_keeps_published_caches(self):
+        self.assertEqual(self.build("--incremental", "--atomic"), 0)
+        self.write("content/index.md", "# New home")
+        self.write("content/contact/index.md", "no heading")
+        self.assertEqual(self.build("--incremental", "--atomic"), 1)
+        self.assertIn("<title>Home</title>", self.read("docs/index.html"))
+
+        self.write("content/contact/index.md", "# Contact")
+        self.assertEqual(self.build("--incremental", "--atomic"), 0)
+        self.assertIn("<title>New home</title>", self.read("docs/index.html"))
+        self.assertFalse(os.path.exists(".ssg_cache.published"))
+
+
+    def test_refill_after_fingerprint_build_uses_plain_asset_urls(self):
+        self.write("static/site.css", "body {}")
+        self.write("content/index.md", "# Home\n\n[style](/site.css)")
+        self.assertEqual(self.build("--incremental", "--fingerprint"), 0)
+        self.assertNotIn('href="/static_site_generator/site.css"', self.read("docs/index.html"))
+
+        # A full build records the page without caching its body, so the
+        # next template change refills from the fingerprinted build's body
+        self.assertEqual(self.build(), 0)
+        self.write("template.html", "<title>{{ Title }}!</title>{{ Content }}")
+        self.assertEqual(self.build("--incremental"), 0)
+        self.assertIn('href="/static_site_generator/site.css"', self.read("docs/index.html"))
+
+
+class TestGeneratePage(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp.name, "index.md")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.dest = os.path.join(self.tmp.name, "docs", "index.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def test_parse_error_keeps_old_page(self):
+        self.write(self.source, "# Home\n\nok para")
+        generate_page(self.source, self.template, self.dest)
+        with open(self.dest) as f:
+            old = f.read()
+
+        self.write(self.source, "# Home\n\nok para\n\nan **unclosed bold")
+        with self.assertRaises(Exception):
+            generate_page(self.source, self.template, self.dest)
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), old)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+
+class TestRunJobs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.work = []
+        for name, text in [("a", "# A"), ("b", "no heading"), ("c", "# C")]:
+            source = os.path.join(self.tmp.name, "content", name + ".md")
+            self.write(source, text)
+            dest = os.path.join(self.tmp.name, "docs", name + ".html")
+            self.work.append((source, self.template, dest, "/", None, False, None))
+
+    def check(self, jobs):
+        failures, infos = run_jobs(_render_page_job, self.work, jobs)
+        bad = self.work[1][0]
+        self.assertEqual(failures, {bad: "Exception: No h1 header found in markdown"})
+        self.assertEqual(sorted(infos), [self.work[0][0], self.work[2][0]])
+        self.assertEqual(infos[self.work[2][0]]["title"], "C")
+        for source, _, dest, *_ in self.work:
+            self.assertEqual(os.path.exists(dest), source != bad)
+
+    def test_serial_failure_keeps_going(self):
+        self.check(jobs=1)
+
+    def test_parallel_failure_keeps_going(self):
+        self.check(jobs=2)
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_bundle_needs_delta_from(self):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--bundle", "delta.tar.gz"])
+        args = parse_args(["--bundle", "delta.tar.gz", "--delta-from", "old.json"])
+        self.assertEqual(args.bundle, "delta.tar.gz")
+
+
+class TestIncrementalBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/a/)")
+        self.write(os.path.join(self.content, "blog", "a", "index.md"), "# A")
+        self.out = io.StringIO()
+        tracing.tracer.add_sink(tracing.TextSink(self.out, tracing.INFO))
+        self.addCleanup(tracing.tracer.reset)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.dest, rel_path)) as f:
+            return f.read()
+
+    def build(self, basepath="/"):
+        """Run an incremental build and return its (rendered, refilled, unchanged, removed) counts."""
+        self.out.truncate(0)
+        failures = generate_pages_incrementally(self.content, self.template, self.dest, basepath, manifest_path=self.manifest)
+        self.assertEqual(failures, {})
+        match = re.search(r"(\d+) rendered, (\d+) refilled, (\d+) unchanged, (\d+) removed", self.out.getvalue())
+        return tuple(int(count) for count in match.groups())
+
+    def test_unchanged_pages_are_skipped(self):
+        self.assertEqual(self.build(), (2, 0, 0, 0))
+        self.assertEqual(self.build(), (0, 0, 2, 0))
+
+    def test_edited_page_is_rendered(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "a", "index.md"), "# A, edited")
+        self.assertEqual(self.build(), (1, 0, 1, 0))
+        self.assertIn("<title>A, edited</title>", self.read("blog/a/index.html"))
+
+    def test_deleted_source_output_is_removed(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "a", "index.md"))
+        self.assertEqual(self.build(), (0, 0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_basepath_change_renders_everything(self):
+        self.build()
+        self.assertEqual(self.build("/site/"), (2, 0, 0, 0))
+        self.assertIn('href="/site/blog/a/"', self.read("index.html"))
+
+    def test_template_change_refills(self):
+        self.build()
+        self.write(self.template, "<title>{{ Title }}!</title>{{ Content }}")
+        self.assertEqual(self.build(), (0, 2, 0, 0))
+        self.assertIn("<title>Home!</title>", self.read("index.html"))
+
+    def test_template_change_after_full_build_renders(self):
+        pages = collect_pages(self.content, self.dest)
+        failures, _ = render_pages(pages, self.template)
+        record_pages(pages, failures, self.template, self.dest, manifest_path=self.manifest)
+        self.write(self.template, "<title>{{ Title }}!</title>{{ Content }}")
+        # A full build caches no bodies, so these pages are rendered, not refilled
+        self.assertEqual(self.build(), (2, 0, 0, 0))
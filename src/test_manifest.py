@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import manifest
+from manifest import BuildManifest, hash_file, load_body, save_body
+from testutil import TempDirTestCase
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp.name, "index.md")
+        self.output = os.path.join(self.tmp.name, "index.html")
+        self.manifest_path = os.path.join(self.tmp.name, "cache", "manifest.json")
+        with open(self.source, "w") as f:
+            f.write("# Hello")
+        with open(self.output, "w") as f:
+            f.write("<h1>Hello</h1>")
+
+    def record(self, manifest):
+        source_hash = manifest.source_hash(self.source)
+        manifest.record(self.source, source_hash, "t1", "/", self.output)
+        return source_hash
+
+    def test_missing_manifest_is_empty(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_round_trip(self):
+        manifest = BuildManifest(self.manifest_path)
+        source_hash = self.record(manifest)
+        manifest.save()
+        loaded = BuildManifest.load(self.manifest_path)
+        self.assertEqual(loaded.pages, manifest.pages)
+        self.assertEqual(loaded.inputs()[self.source]["source"], source_hash)
+
+    def test_source_hash_rehashes_edited_file(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.record(manifest)
+        with open(self.source, "w") as f:
+            f.write("# Hello, edited")
+        self.assertEqual(manifest.source_hash(self.source), hash_file(self.source))
+
+    def test_remove_missing_returns_outputs(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.record(manifest)
+        self.assertEqual(manifest.remove_missing(set()), [self.output])
+        self.assertEqual(manifest.pages, {})
+
+
+class TestBodyCache(unittest.TestCase):
+    def test_streamed_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bodies", "a.html")
+            html = '<div><p>one\ntwo</p><pre><code>x  y</code></pre>tail</div>'
+            with save_body(path, "A \"title\"") as write:
+                for piece in ["<div>", "<p>", "one\ntwo", "</p>", html[len("<div><p>one\ntwo</p>"):]]:
+                    write(piece)
+            self.assertIsNone(load_body(os.path.join(tmp, "missing.html")))
+
+            self.addCleanup(setattr, manifest, "BODY_CHUNK_SIZE", manifest.BODY_CHUNK_SIZE)
+            manifest.BODY_CHUNK_SIZE = 5
+            body = load_body(path)
+            self.assertEqual(body.title, 'A "title"')
+            pieces = []
+            body.write_html(pieces.append)
+            self.assertEqual("".join(pieces), html)
+            # Pieces are only cut after a tag, never inside one
+            self.assertTrue(all(piece.endswith(">") for piece in pieces))
+
+    def test_failed_write_leaves_no_body(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.html")
+            with self.assertRaises(ValueError):
+                with save_body(path, "A") as write:
+                    write("<p>")
+                    raise ValueError("parse error")
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
+import io
 import unittest
-from markdown_to_blocks import extract_title, markdown_to_blocks , block_to_block_type , BlockType
+from markdown_to_blocks import extract_title, markdown_to_blocks , block_to_block_type , BlockType, iter_blocks, markdown_to_html_node, classify_block, parse_document, stream_document, iter_numbered_blocks
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -46,6 +47,78 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_fenced_code_with_blank_lines(self):
+        md = """
+Before
+
+```
+first
+
+second
+```
+
+After
+"""
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Before", "```\nfirst\n\nsecond\n```", "After"])
+        self.assertEqual(block_to_block_type(blocks[1]), BlockType.CODE)
+
+    def test_single_line_fence_does_not_open(self):
+        md = "```code```\n\nNext paragraph"
+        self.assertEqual(markdown_to_blocks(md), ["```code```", "Next paragraph"])
+
+    def test_iter_blocks_from_file(self):
+        f = io.StringIO("# Title\n\nSome text\nmore\n\n\n- item\n")
+        blocks = iter_blocks(f)
+        self.assertEqual(next(blocks), "# Title")
+        self.assertEqual(list(blocks), ["Some text\nmore", "- item"])
+
+    def test_fenced_code_html(self):
+        node = markdown_to_html_node("```\na\n\nb\n```")
+        self.assertEqual(node.to_html(), "<div><pre><code>\na\n\nb\n</code></pre></div>")
+
+    def test_parse_document(self):
+        md = "# Title\n\nSee [the **wiki**](/wiki) and\n![img](/a.png) here\n\n- a\n- [one](/one)"
+        doc = parse_document(md)
+        self.assertEqual(doc.title, "Title")
+        self.assertEqual(doc.links, [("/wiki", 3), ("/one", 7)])
+        self.assertEqual(doc.images, [("/a.png", "img", 4)])
+        self.assertEqual(doc.word_count, 8)
+        self.assertTrue(doc.html_node.to_html().startswith("<div><h1>Title</h1>"))
+
+    def test_document_headings(self):
+        doc = parse_document("## Intro\n\n# Main _Title_\n\n## Intro\n\n### Q&A!")
+        self.assertEqual(doc.title, "Main Title")
+        self.assertEqual(
+            doc.headings,
+            [(2, "Intro", "intro"), (1, "Main Title", "main-title"), (2, "Intro", "intro-2"), (3, "Q&A!", "q-a")],
+        )
+
+    def test_front_matter(self):
+        doc = parse_document("---\ndate: 2024-05-01\ntags: python, Web ,\n---\n\n# Title\n\ntext")
+        self.assertEqual(doc.front_matter, {"date": "2024-05-01", "tags": "python, Web ,"})
+        self.assertEqual(doc.tags, ["python", "Web"])
+        self.assertEqual(doc.html_node.to_html(), "<div><h1>Title</h1><p>text</p></div>")
+        self.assertEqual(parse_document("# T").tags, [])
+
+    def test_numbered_blocks(self):
+        md = "# A\n\n\npara\ngraph\n\n```\nx\n\ny\n```"
+        self.assertEqual(
+            list(iter_numbered_blocks(md)),
+            [(1, "# A"), (4, "para\ngraph"), (7, "```\nx\n\ny\n```")],
+        )
+
+    def test_stream_document(self):
+        doc, nodes = stream_document("intro\n\n# Title\n\n[x](/x)")
+        self.assertEqual(doc.title, "Title")
+        self.assertEqual(doc.links, [])
+        self.assertEqual(len(list(nodes)), 3)
+        self.assertEqual(doc.links, [("/x", 5)])
+
+    def test_stream_document_no_title(self):
+        with self.assertRaises(Exception):
+            stream_document("## Only h2")
+
 
 class TestBlockToBlockType(unittest.TestCase):
     
@@ -169,6 +242,19 @@ class TestBlockToBlockType(unittest.TestCase):
         block = ""
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_classify_block_returns_lines(self):
+        self.assertEqual(
+            classify_block("- a\n- b"),
+            (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+        )
+        self.assertEqual(classify_block("# Heading"), (BlockType.HEADING, None))
+
+    def test_ordered_list_html_reuses_lines(self):
+        items = "\n".join(f"{i}. item {i}" for i in range(1, 12))
+        node = markdown_to_html_node(items)
+        self.assertEqual(node.to_html().count("<li>"), 11)
+        self.assertIn("<li>item 11</li>", node.to_html())
+
 
 class TestExtractTitle(unittest.TestCase):
     
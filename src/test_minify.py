@@ -0,0 +1,38 @@
+import unittest
+from minify import Minifier, minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_drops_whitespace_around_blocks(self):
+        self.assertEqual(
+            minify_html("<html>\n  <body>\n    <p>Hello\n   world</p>\n  </body>\n</html>\n"),
+            "<html><body><p>Hello world</p></body></html>",
+        )
+
+    def test_keeps_inline_spacing(self):
+        self.assertEqual(
+            minify_html("<p>a  <b>bold</b>\n<i>it</i> end</p>"),
+            "<p>a <b>bold</b> <i>it</i> end</p>",
+        )
+
+    def test_drops_comments(self):
+        self.assertEqual(minify_html("<div><!-- note\n --> <p>x</p></div>"), "<div><p>x</p></div>")
+
+    def test_preserves_pre_and_code(self):
+        html = "<p>use <code>a  =  b</code></p>\n<pre><code>\nx\n\n  y\n</code></pre>"
+        self.assertEqual(minify_html(html), html.replace("</p>\n", "</p>"))
+
+    def test_streamed_in_pieces(self):
+        parts = []
+        minifier = Minifier(parts.append)
+        for chunk in ["<div>", "<p>", "one\n", "two ", "<b>x</b>", "</p>", "\n  ", "</div>"]:
+            minifier(chunk)
+        minifier.flush()
+        self.assertEqual("".join(parts), "<div><p>one two <b>x</b></p></div>")
+
+    def test_stray_angle_bracket(self):
+        self.assertEqual(minify_html("<p>1 < 2\n and</p>"), "<p>1 < 2 and</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from output import OutputWriter, open_replacing, prepare_staging, publish, write_if_changed
+from testutil import TempDirTestCase
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def test_skips_identical_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a", "index.html")
+            self.assertTrue(write_if_changed(path, b"<p>hi</p>"))
+            mtime = os.stat(path).st_mtime_ns
+            self.assertFalse(write_if_changed(path, b"<p>hi</p>"))
+            self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+            self.assertTrue(write_if_changed(path, b"<p>bye</p>"))
+
+
+class TestOpenReplacing(unittest.TestCase):
+    def test_keeps_identical_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.html")
+            with open_replacing(path) as f:
+                f.write("<p>hi</p>")
+            st = os.stat(path)
+            with open_replacing(path) as f:
+                f.write("<p>hi</p>")
+            self.assertEqual((os.stat(path).st_ino, os.stat(path).st_mtime_ns), (st.st_ino, st.st_mtime_ns))
+            with open_replacing(path) as f:
+                f.write("<p>bye</p>")
+            self.assertNotEqual(os.stat(path).st_ino, st.st_ino)
+            self.assertEqual(os.listdir(tmp), ["index.html"])
+
+
+class TestOutputWriter(unittest.TestCase):
+    def test_writes_and_skips(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, f"page{i}", "index.html") for i in range(10)]
+            with OutputWriter(max_workers=3, max_in_flight=16) as writer:
+                for i, path in enumerate(paths):
+                    writer.write(path, f"<p>{i}</p>")
+            self.assertEqual(writer.written, 10)
+            self.assertEqual(writer.in_flight, 0)
+
+            with OutputWriter() as writer:
+                for i, path in enumerate(paths):
+                    writer.write(path, f"<p>{i}</p>")
+            self.assertEqual((writer.written, writer.skipped), (0, 10))
+
+
+class TestPublish(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.dest)
+        with open(os.path.join(self.dest, "index.html"), "w") as f:
+            f.write("old")
+
+    def read(self):
+        with open(os.path.join(self.dest, "index.html")) as f:
+            return f.read()
+
+    def stage_new_version(self, mode):
+        staging = prepare_staging(self.dest, mode)
+        self.assertEqual(os.listdir(staging), ["index.html"])
+        write_if_changed(os.path.join(staging, "index.html"), b"new")
+        # The published file is hardlinked, but writes replace it, not modify it
+        self.assertEqual(self.read(), "old")
+        return staging
+
+    def test_rename_publish(self):
+        staging = self.stage_new_version("rename")
+        publish(staging, self.dest, "rename")
+        self.assertEqual(self.read(), "new")
+        self.assertFalse(os.path.exists(staging))
+
+    def test_symlink_publish(self):
+        for version in ["new", "newer"]:
+            staging = prepare_staging(self.dest, "symlink")
+            write_if_changed(os.path.join(staging, "index.html"), version.encode())
+            publish(staging, self.dest, "symlink")
+            self.assertTrue(os.path.islink(self.dest))
+            self.assertEqual(self.read(), version)
+        releases = os.listdir(self.dest + ".releases")
+        self.assertEqual(len(releases), 1)
+
+
+    def test_switch_publish_modes(self):
+        for mode in ["symlink", "rename", "rename", "symlink", "symlink"]:
+            staging = prepare_staging(self.dest, mode)
+            write_if_changed(os.path.join(staging, "index.html"), mode.encode())
+            publish(staging, self.dest, mode)
+            self.assertEqual(os.path.islink(self.dest), mode == "symlink")
+            self.assertEqual(self.read(), mode)
+            self.assertFalse(os.path.lexists(self.dest + ".old"))
+        self.assertEqual(len(os.listdir(self.dest + ".releases")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from site_index import PageMeta, SiteIndex, build_atom_feed, build_sitemap, normalize_date, page_url, remove_site_files, write_site_files
+
+
+def meta(path, url, date):
+    return PageMeta(path, url, f"Title of {url}", date, 10, [["/contact", 3]], [["/images/a.png", 1]])
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SiteIndex()
+        self.index.update(meta("content/index.md", "/site/", "2025-01-01T00:00:00+00:00"))
+        self.index.update(meta("content/blog/a/index.md", "/site/blog/a/", "2025-02-01T00:00:00+00:00"))
+        self.index.update(meta("content/blog/b/index.md", "/site/blog/b/", "2025-03-01T00:00:00+00:00"))
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs", "/site/"), "/site/")
+        self.assertEqual(page_url("docs/blog/tom/index.html", "docs", "/site/"), "/site/blog/tom/")
+        self.assertEqual(page_url("docs/about.html", "docs", "/"), "/about.html")
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.index.path = os.path.join(tmp, "cache", "index.json")
+            self.index.save()
+            loaded = SiteIndex.load(self.index.path)
+            self.assertEqual(loaded.pages, self.index.pages)
+
+    def test_normalize_date(self):
+        self.assertEqual(normalize_date("2024-05-01"), "2024-05-01T00:00:00+00:00")
+        self.assertEqual(normalize_date("2024-05-01T10:30:00+02:00"), "2024-05-01T10:30:00+02:00")
+
+    def test_retain(self):
+        self.index.retain({"content/index.md"})
+        self.assertEqual(list(self.index.pages), ["content/index.md"])
+
+    def test_sorted_pages_newest_first(self):
+        urls = [page.url for page in self.index.sorted_pages("/site/blog/")]
+        self.assertEqual(urls, ["/site/blog/b/", "/site/blog/a/"])
+
+    def test_sitemap(self):
+        sitemap = build_sitemap(self.index, "https://example.com")
+        self.assertIn("<loc>https://example.com/site/blog/a/</loc>", sitemap)
+        self.assertEqual(sitemap.count("<url>"), 3)
+
+    def test_atom_feed_escapes_titles(self):
+        page = PageMeta("x.md", "/x/", "Fish & Chips", "2025-01-01T00:00:00+00:00")
+        feed = build_atom_feed([page], "https://example.com", "Blog", "https://example.com/feed.xml")
+        self.assertIn("<title>Fish &amp; Chips</title>", feed)
+
+    def test_write_site_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "docs")
+            record = os.path.join(tmp, "cache", "site_files.json")
+            write_site_files(self.index, dest, "https://example.com/", "/site/", record_path=record)
+            with open(os.path.join(dest, "blog", "feed.xml")) as f:
+                feed = f.read()
+            self.assertEqual(feed.count("<entry>"), 2)
+            self.assertTrue(os.path.exists(os.path.join(dest, "blog", "rss.xml")))
+            self.assertTrue(os.path.exists(os.path.join(dest, "sitemap.xml")))
+
+            self.assertEqual(remove_site_files(dest, record), 3)
+            self.assertEqual(os.listdir(dest), [])
+            self.assertEqual(remove_site_files(dest, record), 0)
+
+    def test_feeds_link_home_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            record = os.path.join(tmp, "site_files.json")
+            write_site_files(self.index, tmp, "https://example.com/", "/site/", home_url="/site/blog/page/", record_path=record)
+            with open(os.path.join(tmp, "blog", "feed.xml")) as f:
+                self.assertIn('<link href="https://example.com/site/blog/page/" rel="alternate"/>', f.read())
+            with open(os.path.join(tmp, "blog", "rss.xml")) as f:
+                self.assertIn("<link>https://example.com/site/blog/page/</link>", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
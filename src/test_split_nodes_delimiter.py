@@ -242,6 +242,34 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertListEqual(nodes, expected)
 
+    def test_text_to_textnodes_matches_multi_pass(self):
+        texts = [
+            "",
+            "**bold** _it_ `code` ![i](a.png) [l](b) tail",
+            "[a](1)[b](2)![c](3) and [d](4)",
+            "a [not a link] and ![not an image] here",
+            "****empty bold then **text**",
+        ]
+        for text in texts:
+            nodes = [TextNode(text, InlineTextType.PLAIN)]
+            nodes = split_nodes_delimiter(nodes, "**", InlineTextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", InlineTextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", InlineTextType.CODE)
+            nodes = split_nodes_link(split_nodes_image(nodes))
+            self.assertListEqual(text_to_textnodes(text), nodes)
+
+    def test_text_to_textnodes_underscore_in_url(self):
+        nodes = text_to_textnodes("See [the wiki](https://example.com/a_b_c)")
+        expected = [
+            TextNode("See ", InlineTextType.PLAIN),
+            TextNode("the wiki", InlineTextType.LINK, "https://example.com/a_b_c"),
+        ]
+        self.assertListEqual(nodes, expected)
+
+    def test_text_to_textnodes_unclosed_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This **never closes")
+
 
 if __name__ == "__main__":
     unittest.main()
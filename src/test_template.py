@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from template import CompiledTemplate, TemplateError, load_template
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_render(self):
+        template = CompiledTemplate.compile(
+            "<title>{{ Title }}</title><article>{{ Content }}</article>"
+        )
+        self.assertEqual(
+            template.render(Title="Hello", Content="<p>World</p>"),
+            "<title>Hello</title><article><p>World</p></article>",
+        )
+
+    def test_segments(self):
+        template = CompiledTemplate.compile("a{{ Title }}b{{Content}}c")
+        self.assertEqual(template.segments, ["a", "b", "c"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_title_is_escaped(self):
+        template = CompiledTemplate.compile("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            template.render(Title='Fish & "Chips" <3', Content="<b>x</b>"),
+            'Fish &amp; "Chips" &lt;3|<b>x</b>',
+        )
+
+    def test_unknown_placeholder_raises(self):
+        with self.assertRaises(TemplateError):
+            CompiledTemplate.compile("{{ Title }}{{ Content }}{{ Author }}")
+
+    def test_minified(self):
+        template = CompiledTemplate.compile(
+            "<html>\n  <title>{{ Title }}</title>\n  <!-- body -->\n  <article>{{ Content }}</article>\n</html>\n"
+        ).minified()
+        self.assertEqual(
+            template.render(Title="A  B", Content="<p>x\n  y</p>\n"),
+            "<html><title>A  B</title><article><p>x y</p></article></html>",
+        )
+
+    def test_missing_placeholder_raises(self):
+        with self.assertRaises(TemplateError):
+            CompiledTemplate.compile("<title>{{ Title }}</title>")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def test_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>{{ Content }}")
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.render(Title="T", Content="C"), "<h1>T</h1>C")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from textnode import TextNode, InlineTextType, text_node_to_html_node
+from urls import UrlResolver
 
 
 class TestTextNode(unittest.TestCase):
@@ -38,6 +39,16 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Sample", InlineTextType.ITALIC)
         self.assertNotEqual(node1, node2)
 
+    def test_link_resolved_with_basepath(self):
+        node = TextNode("Home", InlineTextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, UrlResolver("/site/"))
+        self.assertEqual(html_node.to_html(), '<a href="/site/blog/tom">Home</a>')
+
+    def test_code_text_not_resolved(self):
+        node = TextNode('href="/blog/"', InlineTextType.CODE)
+        html_node = text_node_to_html_node(node, UrlResolver("/site/"))
+        self.assertEqual(html_node.to_html(), '<code>href="/blog/"</code>')
+
 
 if __name__ == "__main__":
     unittest.main()
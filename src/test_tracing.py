@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from tracing import DEBUG, INFO, OFF, WARNING, JsonLinesSink, TextSink, Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_by_default(self):
+        tracer = Tracer()
+        self.assertEqual(tracer.level, OFF)
+        self.assertFalse(tracer.on(DEBUG))
+        self.assertFalse(tracer.on(WARNING))
+
+    def test_text_sink_respects_level(self):
+        out = io.StringIO()
+        tracer = Tracer()
+        tracer.add_sink(TextSink(out, level=INFO))
+        self.assertFalse(tracer.on(DEBUG))
+        tracer.event(DEBUG, "copy", source="a", dest="b")
+        tracer.message(INFO, "Copy complete")
+        self.assertEqual(out.getvalue(), "Copy complete\n")
+
+    def test_text_sink_formats_fields(self):
+        out = io.StringIO()
+        tracer = Tracer()
+        tracer.add_sink(TextSink(out, level=DEBUG))
+        tracer.event(DEBUG, "copy", source="a", dest="b")
+        self.assertEqual(out.getvalue(), "[copy] source=a dest=b\n")
+
+    def test_hooks_receive_stage_events(self):
+        tracer = Tracer()
+        events = []
+        tracer.add_hook("page_end", events.append)
+        self.assertTrue(tracer.on(DEBUG))
+        tracer.event(DEBUG, "page_start", source="x.md")
+        tracer.event(DEBUG, "page_end", source="x.md", ms=1.5)
+        self.assertEqual([(e["stage"], e["ms"]) for e in events], [("page_end", 1.5)])
+
+    def test_json_lines_sink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl")
+            tracer = Tracer()
+            tracer.add_sink(JsonLinesSink(path))
+            tracer.event(DEBUG, "write", dest="docs/index.html")
+            tracer.reset()
+            with open(path) as f:
+                event = json.loads(f.readline())
+            self.assertEqual(event["stage"], "write")
+            self.assertEqual(event["level"], "debug")
+            self.assertEqual(event["dest"], "docs/index.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
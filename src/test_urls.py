@@ -0,0 +1,63 @@
+import unittest
+from fingerprint import AssetMap
+from urls import UrlResolver, normalize_basepath
+
+
+class TestUrlResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = UrlResolver("/static_site_generator/")
+
+    def test_normalize_basepath(self):
+        self.assertEqual(normalize_basepath("site"), "/site/")
+        self.assertEqual(normalize_basepath("/"), "/")
+
+    def test_root_relative(self):
+        self.assertEqual(self.resolver.resolve("/"), "/static_site_generator/")
+        self.assertEqual(
+            self.resolver.resolve("/images/tom.png"),
+            "/static_site_generator/images/tom.png",
+        )
+
+    def test_bare_relative(self):
+        self.assertEqual(self.resolver.resolve("contact"), "/static_site_generator/contact")
+        self.assertEqual(
+            self.resolver.resolve("blog/tom"), "/static_site_generator/blog/tom"
+        )
+
+    def test_page_relative_untouched(self):
+        for url in ["./x", "../tom", "?q=1", "tom.png", "../images/a.png"]:
+            self.assertEqual(self.resolver.resolve(url), url)
+        self.assertEqual(self.resolver.rewrite_attributes('<a href="../tom">'), '<a href="../tom">')
+
+    def test_external_untouched(self):
+        for url in ["https://boot.dev", "//cdn.example.com/a.js", "mailto:a@b.c", "#top"]:
+            self.assertEqual(self.resolver.resolve(url), url)
+
+    def test_fingerprinted_assets(self):
+        assets = AssetMap({"index.css": "index.1234abcd.css", "images/a.png": "images/a.5678ef90.png"}, {"images/a.png": (4, 3)})
+        resolver = UrlResolver("/site/", assets)
+        self.assertEqual(resolver.resolve("/index.css"), "/site/index.1234abcd.css")
+        self.assertEqual(resolver.resolve("images/a.png#x"), "/site/images/a.5678ef90.png#x")
+        self.assertEqual(resolver.resolve("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(
+            resolver.image_attributes("/images/a.png"),
+            (("width", 4), ("height", 3), ("loading", "lazy"), ("decoding", "async")),
+        )
+        self.assertEqual(self.resolver.image_attributes("/images/a.png"), ())
+
+    def test_rewrite_attributes(self):
+        html = """<link href="/index.css" /><img src='images/a.png'><a href= "/blog">"""
+        self.assertEqual(
+            self.resolver.rewrite_attributes(html),
+            """<link href="/static_site_generator/index.css" />"""
+            """<img src='/static_site_generator/images/a.png'>"""
+            """<a href= "/static_site_generator/blog">""",
+        )
+
+    def test_rewrite_attributes_leaves_text(self):
+        html = "<code>href=/ and src</code>"
+        self.assertEqual(self.resolver.rewrite_attributes(html), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
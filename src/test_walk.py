@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+from walk import is_excluded, walk_files
+from testutil import TempDirTestCase
+
+
+class TestWalkFiles(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        for rel_path in ["b.md", "a.md", "z/index.md", "c/notes.txt", "c/index.md", "drafts/wip.md", "c/.hidden.md"]:
+            self.write(os.path.join(self.root, rel_path), "")
+
+    def walk(self, **kwargs):
+        return [rel_path for rel_path, _ in walk_files(self.root, **kwargs)]
+
+    def test_sorted_files_before_subdirectories(self):
+        self.assertEqual(
+            self.walk(),
+            ["a.md", "b.md", "c/.hidden.md", "c/index.md", "c/notes.txt", "drafts/wip.md", "z/index.md"],
+        )
+
+    def test_include_and_exclude(self):
+        self.assertEqual(
+            self.walk(include=["*.md"], exclude=["drafts", ".*"]),
+            ["a.md", "b.md", "c/index.md", "z/index.md"],
+        )
+        self.assertEqual(self.walk(include=["c/*"]), ["c/.hidden.md", "c/index.md", "c/notes.txt"])
+
+    def test_is_excluded_agrees_with_walk(self):
+        exclude = ["drafts", ".*", "c/notes.txt"]
+        kept = self.walk(exclude=exclude)
+        for rel_path in self.walk():
+            self.assertEqual(is_excluded(rel_path, exclude), rel_path not in kept, rel_path)
+
+    def test_yields_dir_entries_lazily(self):
+        walker = walk_files(self.root)
+        rel_path, entry = next(walker)
+        self.assertEqual(entry.path, os.path.join(self.root, "a.md"))
+        self.assertTrue(entry.is_file())
+
+    def test_deeper_than_recursion_limit(self):
+        depth = 150
+        directory = os.path.join(self.root, "deep", *["d"] * depth)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "x.md"), "w") as f:
+            f.write("")
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(100)
+        try:
+            deepest = [rel_path for rel_path, _ in walk_files(os.path.join(self.root, "deep"))]
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertEqual(deepest, ["d/" * depth + "x.md"])
+
+if __name__ == "__main__":
+    unittest.main()
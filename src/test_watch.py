@@ -0,0 +1,121 @@
+import os
+import unittest
+from assets import sync_static
+from fingerprint import build_asset_map
+from main import fill_page, generate_page
+from watch import SiteWatcher, diff_snapshots, page_output_path
+from testutil import TempDirTestCase
+
+
+class TestWatch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(self.static)
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.rendered = []
+        self.removed = []
+        self.watcher = SiteWatcher(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            render_page=lambda source, template, dest, basepath, assets=None, copy_body=None: self.rendered.append(dest),
+            remove_page=lambda dest, root: self.removed.append(dest),
+        )
+
+    def test_page_output_path(self):
+        self.assertEqual(
+            page_output_path("content/blog/tom/index.md", "content", "docs"),
+            os.path.join("docs", "blog", "tom", "index.html"),
+        )
+
+    def test_diff_snapshots(self):
+        changed, removed = diff_snapshots({"a": (1, 1), "b": (1, 1)}, {"a": (2, 1), "c": (1, 1)})
+        self.assertEqual(sorted(changed), ["a", "c"])
+        self.assertEqual(removed, ["b"])
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), 0)
+        self.assertEqual(self.rendered, [])
+
+    def test_content_edit_renders_one_page(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home, edited")
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.rendered, [os.path.join(self.dest, "index.html")])
+
+    def test_deleted_page_is_removed(self):
+        os.remove(os.path.join(self.content, "index.md"))
+        self.watcher.poll()
+        self.assertEqual(self.removed, [os.path.join(self.dest, "index.html")])
+
+    def test_template_edit_renders_every_page(self):
+        st = os.stat(self.template)
+        os.utime(self.template, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.watcher.poll(), 2)
+
+    def test_template_edit_refills_rendered_bodies(self):
+        parsed = []
+
+        def render_page(source, *args, **kwargs):
+            parsed.append(source)
+            return generate_page(source, *args, **kwargs)
+
+        watcher = SiteWatcher(self.content, self.static, self.template, self.dest, render_page=render_page, fill_page=fill_page)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello _there_")
+        self.assertEqual(watcher.poll(), 1)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        st = os.stat(self.template)
+        os.utime(self.template, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(watcher.poll(), 2)
+
+        # Only the page without a body in memory was parsed again
+        post = os.path.join(self.content, "blog", "post", "index.md")
+        self.assertEqual(parsed, [os.path.join(self.content, "index.md"), post])
+        with open(os.path.join(self.dest, "index.html")) as f:
+            self.assertEqual(f.read(), "<title>Home</title><div><h1>Home</h1><p>Hello <i>there</i></p></div>")
+
+    def test_excluded_files_are_ignored(self):
+        watcher = SiteWatcher(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            render_page=lambda source, template, dest, basepath, assets=None, copy_body=None: self.rendered.append(dest),
+            exclude=["drafts"],
+        )
+        self.write(os.path.join(self.content, "drafts", "wip", "index.md"), "# Draft")
+        self.assertEqual(watcher.poll(), 0)
+        self.assertEqual(self.rendered, [])
+
+    def test_static_edit_keeps_fingerprinted_names(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.write(os.path.join("static", "site.css"), "body {}")
+        assets = build_asset_map("static")
+        sync_static("static", "docs", names=assets.names)
+        watcher = SiteWatcher(
+            "content",
+            "static",
+            "template.html",
+            "docs",
+            render_page=lambda source, template, dest, basepath, assets=None, copy_body=None: self.rendered.append(assets),
+            assets=assets,
+        )
+
+        self.write(os.path.join("static", "site.css"), "body { color: red }")
+        self.assertEqual(watcher.poll(), 2)
+        published = watcher.assets.names["site.css"]
+        self.assertNotEqual(published, assets.names["site.css"])
+        self.assertEqual(os.listdir("docs"), [published])
+        self.assertEqual(self.rendered, [watcher.assets, watcher.assets])
+
+
+if __name__ == "__main__":
+    unittest.main()
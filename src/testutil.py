@@ -0,0 +1,21 @@
+import os
+import tempfile
+import unittest
+
+
+def write_file(path, text):
+    """Write text to path, creating its directories first."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A TestCase with a scratch directory in self.tmp, removed after each test."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, path, text):
+        write_file(path, text)
@@ -11,6 +11,8 @@ class InlineTextType(Enum):
 
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type , url = None):
         self.text = text
         self.text_type = text_type
@@ -26,7 +28,7 @@ class TextNode():
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, resolver=None):
     t = text_node.text_type.value if isinstance(text_node.text_type, InlineTextType) else text_node.text_type
 
     if t == "text":
@@ -38,7 +40,11 @@ def text_node_to_html_node(text_node):
     if t == "code":
         return LeafNode("code", text_node.text)
     if t == "link":
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = resolver.resolve(text_node.url) if resolver is not None else text_node.url
+        return LeafNode("a", text_node.text, (("href", url),))
     if t == "image":
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        if resolver is None:
+            return LeafNode("img", "", (("src", text_node.url), ("alt", text_node.text)))
+        props = (("src", resolver.resolve(text_node.url)), ("alt", text_node.text))
+        return LeafNode("img", "", props + resolver.image_attributes(text_node.url))
     raise ValueError(f"Invalid text type: {t}")
\ No newline at end of file
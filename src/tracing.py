@@ -0,0 +1,111 @@
+import json
+import sys
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+
+
+class TextSink:
+    def __init__(self, stream=None, level=INFO):
+        self.stream = stream
+        self.level = level
+
+    def emit(self, event):
+        stream = self.stream or sys.stdout
+        if "message" in event:
+            print(event["message"], file=stream)
+            return
+        fields = " ".join(f"{k}={v}" for k, v in event.items() if k not in ("time", "level", "stage"))
+        print(f"[{event['stage']}] {fields}", file=stream)
+
+
+class JsonLinesSink:
+    def __init__(self, path, level=DEBUG):
+        self.path = path
+        self.level = level
+        self.file = open(path, "a", buffering=1)
+
+    def emit(self, event):
+        self.file.write(json.dumps(event, default=str) + "\n")
+
+
+class Tracer:
+    """Routes build events to sinks and stage hooks.
+
+    Call sites guard anything costly with tracer.on(level), which is a
+    single comparison; with nothing listening at that level no event dict
+    is built and no diagnostic work runs.
+    """
+
+    def __init__(self):
+        self.sinks = []
+        self.hooks = {}
+        self.level = OFF
+
+    def _update_level(self):
+        levels = [sink.level for sink in self.sinks]
+        if self.hooks:
+            levels.append(DEBUG)
+        self.level = min(levels, default=OFF)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        self._update_level()
+
+    def add_hook(self, stage, callback):
+        """Call callback(event) for every event of the given stage."""
+        self.hooks.setdefault(stage, []).append(callback)
+        self._update_level()
+
+    def reset(self):
+        for sink in self.sinks:
+            if isinstance(sink, JsonLinesSink):
+                sink.file.close()
+        self.sinks = []
+        self.hooks = {}
+        self.level = OFF
+
+    def on(self, level):
+        return level >= self.level
+
+    def event(self, level, stage, **fields):
+        if level < self.level:
+            return
+        event = {"time": time.time(), "level": LEVEL_NAMES.get(level, level), "stage": stage}
+        event.update(fields)
+        for sink in self.sinks:
+            if level >= sink.level:
+                sink.emit(event)
+        for callback in self.hooks.get(stage, ()):
+            callback(event)
+
+    def message(self, level, text):
+        if level >= self.level:
+            self.event(level, "message", message=text)
+
+
+tracer = Tracer()
+_config = (OFF, None, DEBUG)
+
+
+def configure(level=INFO, trace_file=None, trace_level=DEBUG):
+    """Reset the global tracer to print at level and optionally log JSON lines."""
+    global _config
+    _config = (level, trace_file, trace_level)
+    tracer.reset()
+    if level < OFF:
+        tracer.add_sink(TextSink(level=level))
+    if trace_file:
+        tracer.add_sink(JsonLinesSink(trace_file, trace_level))
+    return tracer
+
+
+def current_config():
+    """Arguments that reproduce the current configuration, e.g. in a worker."""
+    return _config
@@ -0,0 +1,83 @@
+import re
+
+SCHEME_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+URL_ATTRIBUTE_PATTERN = re.compile(r"""\b(href|src)(\s*=\s*)(["'])(.*?)\3""", re.DOTALL)
+# Bare links the content and template have always written relative to the site root
+SITE_ROOT_NAMES = ("contact", "index.css")
+SITE_ROOT_PREFIXES = ("blog/", "contact/", "images/")
+
+
+def normalize_basepath(basepath):
+    if not basepath.startswith("/"):
+        basepath = "/" + basepath
+    if not basepath.endswith("/"):
+        basepath = basepath + "/"
+    return basepath
+
+
+def is_external(url):
+    return url.startswith("//") or SCHEME_PATTERN.match(url) is not None
+
+
+class UrlResolver:
+    """Maps site URLs written in content and templates to published URLs.
+
+    Root-relative links ("/images/x.png") and the bare site links in
+    SITE_ROOT_NAMES and SITE_ROOT_PREFIXES ("images/x.png") are prefixed
+    with the basepath. External URLs, fragments and links relative to
+    the page ("./x", "../tom", "?q=1") are left untouched.
+    With an AssetMap, static files are mapped to their fingerprinted names.
+    """
+
+    def __init__(self, basepath="/", assets=None):
+        self.basepath = normalize_basepath(basepath)
+        self.assets = assets
+
+    @property
+    def cache_key(self):
+        """Identifies everything that affects resolved URLs, for caches keyed on them."""
+        return self.basepath, self.assets.digest if self.assets is not None else None
+
+    def site_path(self, url):
+        """url relative to the site root, or None if it is external or relative to the page."""
+        if is_external(url):
+            return None
+        if url.startswith("/"):
+            return url[1:]
+        if url in SITE_ROOT_NAMES or url.startswith(SITE_ROOT_PREFIXES):
+            return url
+        return None
+
+    def resolve(self, url):
+        if not url or url.startswith("#"):
+            return url
+        path = self.site_path(url)
+        if path is None:
+            return url
+        if self.assets is not None:
+            path = self.assets.published_path(path)
+        return self.basepath + path
+
+    def image_attributes(self, url):
+        """Extra <img> attributes for url: its size, and lazy loading, when assets are known."""
+        if self.assets is None:
+            return ()
+        attributes = ()
+        path = self.site_path(url)
+        if path is not None:
+            size = self.assets.image_size(path)
+            if size is not None:
+                attributes = (("width", size[0]), ("height", size[1]))
+        return attributes + (("loading", "lazy"), ("decoding", "async"))
+
+    def rewrite_attributes(self, html):
+        """Resolve every href/src attribute value in a chunk of markup."""
+
+        def replace(match):
+            name, equals, quote, url = match.groups()
+            return f"{name}{equals}{quote}{self.resolve(url)}{quote}"
+
+        return URL_ATTRIBUTE_PATTERN.sub(replace, html)
+
+    def __repr__(self):
+        return f"UrlResolver({self.basepath})"
@@ -0,0 +1,42 @@
+import os
+from fnmatch import fnmatchcase
+
+
+def matches(rel_path, name, patterns):
+    """Whether a path or its final component matches any glob in patterns."""
+    return any(fnmatchcase(rel_path, pattern) or fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def is_excluded(rel_path, patterns):
+    """Whether walk_files would skip rel_path, itself or through one of its directories."""
+    segments = rel_path.split("/")
+    return any(matches("/".join(segments[:i + 1]), segments[i], patterns) for i in range(len(segments)))
+
+
+def walk_files(root, include=None, exclude=None):
+    """Lazily yield (rel_path, DirEntry) for every file under root.
+
+    rel_path is /-separated and relative to root. Entries are visited in
+    sorted order, a directory's files before its subdirectories, so the
+    order is the same on every filesystem. The tree is walked with an
+    explicit stack and file types come from the DirEntry, so no entry costs
+    an extra stat call. A file is yielded if it matches an include glob
+    (all files when include is None) and no exclude glob; an excluded
+    directory is not entered at all.
+    """
+    exclude = exclude or ()
+    stack = [("", root)]
+    while stack:
+        rel_dir, directory = stack.pop()
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            if matches(rel_path, entry.name, exclude):
+                continue
+            if entry.is_dir():
+                subdirs.append((rel_path + "/", entry.path))
+            elif entry.is_file() and (include is None or matches(rel_path, entry.name, include)):
+                yield rel_path, entry
+        stack.extend(reversed(subdirs))
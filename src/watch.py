@@ -0,0 +1,167 @@
+import functools
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from assets import scan_files, sync_static
+from fingerprint import build_asset_map
+from tracing import tracer, ERROR, INFO
+from urls import normalize_basepath
+
+
+def page_output_path(source_path, content_dir, dest_dir):
+    rel_path = os.path.relpath(source_path, content_dir)
+    return os.path.join(dest_dir, rel_path[:-len(".md")] + ".html")
+
+
+def snapshot(root, suffix="", exclude=None):
+    if not os.path.isdir(root):
+        return {}
+    return {
+        os.path.join(root, rel_path): (st.st_size, st.st_mtime_ns)
+        for rel_path, st in scan_files(root, exclude).items()
+        if rel_path.endswith(suffix)
+    }
+
+
+def diff_snapshots(old, new):
+    changed = [path for path, stamp in new.items() if old.get(path) != stamp]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+class SiteWatcher:
+    """Polls the site inputs and re-renders only what an edit affects.
+
+    Compiled templates stay cached in this process between edits, so a
+    content edit costs one generate_page call. When assets is an AssetMap
+    the static files are published under fingerprinted names, and a static
+    edit that renames one re-renders every page. Files matching an exclude
+    glob are neither watched nor published. The body of every page rendered
+    here is kept in memory, so with fill_page a template edit only refills
+    those pages instead of parsing them again.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath="/", render_page=None, remove_page=None, interval=0.25, link=False, assets=None, exclude=None, fill_page=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.render_page = render_page
+        self.remove_page = remove_page
+        self.interval = interval
+        self.link = link
+        self.assets = assets
+        self.exclude = exclude
+        self.fill_page = fill_page
+        self.bodies = {}
+        self.content = snapshot(content_dir, ".md", exclude)
+        self.static = snapshot(static_dir, exclude=exclude)
+        self.template_mtime = os.stat(template_path).st_mtime_ns
+
+    def render(self, source_path):
+        dest_path = page_output_path(source_path, self.content_dir, self.dest_dir)
+        self.bodies.pop(source_path, None)
+        parts = []
+        copy_body = parts.append if self.fill_page is not None else None
+        try:
+            doc = self.render_page(source_path, self.template_path, dest_path, self.basepath, assets=self.assets, copy_body=copy_body)
+        except Exception as e:
+            tracer.message(ERROR, f"Error: {source_path}: {type(e).__name__}: {e}")
+            return
+        if self.fill_page is not None:
+            self.bodies[source_path] = (doc.title, "".join(parts))
+
+    def refill(self, source_path):
+        dest_path = page_output_path(source_path, self.content_dir, self.dest_dir)
+        title, body = self.bodies[source_path]
+        try:
+            self.fill_page(self.template_path, dest_path, title, body, self.basepath, assets=self.assets)
+        except Exception as e:
+            tracer.message(ERROR, f"Error: {source_path}: {type(e).__name__}: {e}")
+
+    def update_static(self):
+        """Re-sync the static files and return whether the asset names changed."""
+        if self.assets is None:
+            sync_static(self.static_dir, self.dest_dir, link=self.link, exclude=self.exclude)
+            return False
+        assets = build_asset_map(self.static_dir, exclude=self.exclude)
+        sync_static(self.static_dir, self.dest_dir, link=self.link, names=assets.names, exclude=self.exclude)
+        renamed = assets.digest != self.assets.digest
+        self.assets = assets
+        return renamed
+
+    def poll(self):
+        """Check for changes once and return the number of pages rewritten."""
+        start = time.perf_counter()
+        refill = []
+
+        content = snapshot(self.content_dir, ".md", self.exclude)
+        changed, removed = diff_snapshots(self.content, content)
+        self.content = content
+
+        template_mtime = os.stat(self.template_path).st_mtime_ns
+        if template_mtime != self.template_mtime:
+            # Every page embeds the template; pages whose body is known are refilled
+            self.template_mtime = template_mtime
+            refill = [path for path in content if path in self.bodies and path not in changed]
+            changed = [path for path in content if path not in refill]
+
+        static = snapshot(self.static_dir, exclude=self.exclude)
+        if static != self.static:
+            self.static = static
+            if self.update_static():
+                # Pages link assets by their fingerprinted names
+                changed = list(content)
+                refill = []
+
+        for source_path in changed:
+            self.render(source_path)
+        for source_path in refill:
+            self.refill(source_path)
+        for source_path in removed:
+            self.bodies.pop(source_path, None)
+            self.remove_page(page_output_path(source_path, self.content_dir, self.dest_dir), self.dest_dir)
+
+        if changed or refill or removed:
+            elapsed = (time.perf_counter() - start) * 1000
+            tracer.message(INFO, f"Rebuilt {len(changed)} page(s), refilled {len(refill)}, removed {len(removed)} in {elapsed:.1f} ms")
+        return len(changed) + len(refill)
+
+    def run(self):
+        tracer.message(INFO, f"Watching {self.content_dir}, {self.static_dir} and {self.template_path}")
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+
+class BasepathRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory mounted under the site basepath."""
+
+    basepath = "/"
+
+    def translate_path(self, path):
+        if self.basepath != "/" and path.startswith(self.basepath):
+            path = "/" + path[len(self.basepath):]
+        return super().translate_path(path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory, basepath="/", port=8888, background=False, host="127.0.0.1"):
+    """Serve directory over HTTP, blocking unless background is set.
+
+    Only the local machine can connect unless another host is given.
+    """
+    handler = type("Handler", (BasepathRequestHandler,), {"basepath": normalize_basepath(basepath)})
+    handler = functools.partial(handler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    tracer.message(INFO, f"Serving {directory} at http://localhost:{port}{normalize_basepath(basepath)}")
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server